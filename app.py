@@ -1,5 +1,9 @@
 import eventlet
 eventlet.monkey_patch()
+# psycopg2 is a C extension that monkey_patch can't reach; without this every
+# query blocks the hub (and every other greenlet) until Postgres answers
+from psycogreen.eventlet import patch_psycopg
+patch_psycopg()
 from flask import Flask, jsonify, request
 from extensions import db, migrate, bcrypt, jwt, socketio
 from routes.auth import auth_bp
@@ -10,12 +14,17 @@ from routes.organizations import organizations_bp
 from routes.vehicles import vehicles_bp
 from dotenv import load_dotenv
 from sockets import org_events
-import firebase_admin
-from firebase_admin import credentials, storage
+from utils import user_cache
 import os
-import json
 from routes.users import users_bp
 from routes.misc import misc_bp
+from routes.metrics import metrics_bp
+from sockets.dispatcher import dispatcher
+from sockets.manager import socketio_options
+from commands import register_commands
+from utils.db_pool import engine_options_from_env
+from utils import db_routing, email_outbox, instrumentation, json_provider, sql_profiler
+from utils.json_provider import SocketJSON
 
 
 load_dotenv()
@@ -23,31 +32,88 @@ load_dotenv()
 def create_app():
     app = Flask(__name__)
 
-    if not firebase_admin._apps:  # Prevent multiple initializations
-        firebase_key = os.getenv("FIREBASE_SERVICE_ACCOUNT_KEY")
-        if not firebase_key:
-            raise ValueError("FIREBASE_SERVICE_ACCOUNT_KEY environment variable not set")
-
-        # Try to parse as JSON (Render) or treat as path (local)
-        try:
-            key_data = json.loads(firebase_key)
-            cred = credentials.Certificate(key_data)
-        except json.JSONDecodeError:
-            cred = credentials.Certificate(firebase_key)
-
-        firebase_admin.initialize_app(cred, {
-            "storageBucket": "fleetcheck-db52c.firebasestorage.app"
-        })
-
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Pool size/overflow/timeout/pre-ping/recycle and statement timeout (DB_* env vars)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_from_env()
+    # Optional read replica for GET handlers on the read-heavy blueprints; a user
+    # stays on the primary for REPLICA_STICKY_SECONDS after they write (tracked per worker process)
+    if os.getenv('REPLICA_DATABASE_URL'):
+        app.config['SQLALCHEMY_BINDS'] = {db_routing.REPLICA_BIND: os.getenv('REPLICA_DATABASE_URL')}
+    app.config['REPLICA_STICKY_SECONDS'] = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
+    # Seconds to cache the authenticated user between requests (0 disables)
+    app.config['USER_CACHE_TTL'] = int(os.getenv('USER_CACHE_TTL', 0))
+    # Serialized templates are cached in-process unless a shared Redis URL is given
+    app.config['TEMPLATE_CACHE_URL'] = os.getenv('TEMPLATE_CACHE_URL')
+    # Org socket events are coalesced per room over this window
+    app.config['SOCKET_COALESCE_WINDOW_MS'] = int(os.getenv('SOCKET_COALESCE_WINDOW_MS', 250))
+    # Pub/sub URL shared by all workers so room emits reach every process
+    # (redis://..., amqp://..., or local:// for the in-process stand-in used in tests)
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+    app.config['SOCKETIO_CHANNEL'] = os.getenv('SOCKETIO_CHANNEL', 'flask-socketio')
+    # Request-scoped SQL profiler: logs repeated statements and N+1 lazy loads,
+    # optionally adds a Server-Timing header and writes one JSON file per request
+    app.config['SQL_PROFILER'] = os.getenv('SQL_PROFILER', '').lower() in ('1', 'true')
+    app.config['SQL_PROFILER_REPEAT_THRESHOLD'] = int(os.getenv('SQL_PROFILER_REPEAT_THRESHOLD', 3))
+    app.config['SQL_PROFILER_SERVER_TIMING'] = os.getenv('SQL_PROFILER_SERVER_TIMING', '').lower() in ('1', 'true')
+    app.config['SQL_PROFILER_DUMP_DIR'] = os.getenv('SQL_PROFILER_DUMP_DIR')
+    # "orjson" (default when installed) or "stdlib"
+    app.config['JSON_PROVIDER'] = os.getenv('JSON_PROVIDER', 'orjson')
+    # bcrypt cost for new hashes; existing hashes are upgraded on next login
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # Max password hashes running at once on native threads (default: CPU count)
+    app.config['PASSWORD_HASH_CONCURRENCY'] = int(os.getenv('PASSWORD_HASH_CONCURRENCY', 0)) or None
+    # Outgoing mail goes through the email_outbox table; EMAIL_TRANSPORT is
+    # "sendgrid", "file" (EMAIL_FILE_DIR) or "smtp" (EMAIL_SMTP_HOST/PORT)
+    app.config['EMAIL_TRANSPORT'] = os.getenv('EMAIL_TRANSPORT', 'sendgrid')
+    app.config['EMAIL_FILE_DIR'] = os.getenv('EMAIL_FILE_DIR', 'outbox')
+    app.config['EMAIL_SMTP_HOST'] = os.getenv('EMAIL_SMTP_HOST', 'localhost')
+    app.config['EMAIL_SMTP_PORT'] = int(os.getenv('EMAIL_SMTP_PORT', 1025))
+    app.config['EMAIL_OUTBOX_DISPATCHER'] = os.getenv('EMAIL_OUTBOX_DISPATCHER', '1').lower() in ('1', 'true')
+    app.config['EMAIL_OUTBOX_BATCH_SIZE'] = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 20))
+    app.config['EMAIL_OUTBOX_MAX_ATTEMPTS'] = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+    app.config['EMAIL_OUTBOX_RETRY_BACKOFF'] = int(os.getenv('EMAIL_OUTBOX_RETRY_BACKOFF', 30))
+    # A claimed message is retried if its sender hasn't recorded a result after this long
+    app.config['EMAIL_OUTBOX_LEASE_SECONDS'] = int(os.getenv('EMAIL_OUTBOX_LEASE_SECONDS', 300))
+    # Rows updated/deleted per transaction by background organization deletion
+    app.config['ORG_DELETION_BATCH_SIZE'] = int(os.getenv('ORG_DELETION_BATCH_SIZE', 1000))
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+
+    # Photo storage: "firebase" or "local" (LOCAL_STORAGE_ROOT / LOCAL_STORAGE_URL)
+    app.config['STORAGE_BACKEND'] = os.getenv('STORAGE_BACKEND', 'firebase')
+    # Firebase is initialized on the first upload, not at startup, so CLI commands
+    # and workers that never upload don't import it or need the key
+    app.config['FIREBASE_SERVICE_ACCOUNT_KEY'] = os.getenv('FIREBASE_SERVICE_ACCOUNT_KEY')
+    app.config['FIREBASE_STORAGE_BUCKET'] = os.getenv('FIREBASE_STORAGE_BUCKET', 'fleetcheck-db52c.firebasestorage.app')
+    app.config['LOCAL_STORAGE_ROOT'] = os.getenv('LOCAL_STORAGE_ROOT', 'uploads')
+    app.config['LOCAL_STORAGE_URL'] = os.getenv('LOCAL_STORAGE_URL')
+    app.config['PHOTO_SPOOL_DIR'] = os.getenv('PHOTO_SPOOL_DIR')
+    app.config['PHOTO_UPLOAD_WORKERS'] = int(os.getenv('PHOTO_UPLOAD_WORKERS', 4))
+    app.config['PHOTO_UPLOAD_QUEUE_SIZE'] = int(os.getenv('PHOTO_UPLOAD_QUEUE_SIZE', 100))
+    app.config['PHOTO_UPLOAD_RETRIES'] = int(os.getenv('PHOTO_UPLOAD_RETRIES', 3))
+    app.config['PHOTO_MAX_DIMENSION'] = int(os.getenv('PHOTO_MAX_DIMENSION', 2048))
+    app.config['PHOTO_THUMBNAIL_SIZES'] = [int(s) for s in os.getenv('PHOTO_THUMBNAIL_SIZES', '320').split(',') if s]
+    app.config['PHOTO_JPEG_QUALITY'] = int(os.getenv('PHOTO_JPEG_QUALITY', 85))
 
+    json_provider.init_app(app)
     db.init_app(app)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
     jwt.init_app(app)
-    socketio.init_app(app, async_mode="eventlet")
+    socketio.init_app(
+        app,
+        async_mode="eventlet",
+        json=SocketJSON,
+        **socketio_options(app.config['SOCKETIO_MESSAGE_QUEUE'], app.config['SOCKETIO_CHANNEL']),
+    )
+    dispatcher.init_app(app)
+    db_routing.init_app(app)
+    # Prometheus metrics for every request, scraped from GET /metrics
+    instrumentation.init_app(app)
+    sql_profiler.init_app(app)
+    email_outbox.init_app(app)
+    register_commands(app)
 
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(templates_bp, url_prefix="/templates")
@@ -57,6 +123,7 @@ def create_app():
     app.register_blueprint(vehicles_bp, url_prefix="/vehicles")
     app.register_blueprint(users_bp, url_prefix="/users")   
     app.register_blueprint(misc_bp)
+    app.register_blueprint(metrics_bp, url_prefix="/metrics")
 
     @app.get('/')
     def index():
@@ -66,6 +133,15 @@ def create_app():
 
 
 
+# Single process (development):
+#   python app.py
+#
+# Multiple workers / nodes: set SOCKETIO_MESSAGE_QUEUE so emits are relayed
+# between processes, and run one eventlet worker per gunicorn process (the
+# Socket.IO server keeps per-connection state, so -w must stay at 1):
+#   SOCKETIO_MESSAGE_QUEUE=redis://host:6379/0 gunicorn -k eventlet -w 1 --bind 0.0.0.0:$PORT app:app
+# Scale out by starting more of these behind a load balancer with sticky
+# sessions (or clients forced to the websocket transport).
 app = create_app()
 
 if __name__ == "__main__":
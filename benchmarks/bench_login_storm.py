@@ -0,0 +1,75 @@
+"""Responsiveness of other requests during a login storm.
+
+Fires concurrent POST /auth/login requests from green threads while a probe
+greenlet requests a cheap endpoint every few milliseconds. The probe latency
+includes time spent waiting for the hub beyond its sleep interval.
+With bcrypt on the tpool the probe stays fast; --inline runs bcrypt on the
+hub (the old behaviour) for comparison.
+
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.bench_login_storm [--logins 100] [--inline]
+"""
+import argparse
+import json
+import time
+from benchmarks.common import bootstrap, seed_fleet, summarize
+
+PASSWORD = "correct horse battery staple"
+PROBE_URL = "/.well-known/assetlinks.json"
+PROBE_INTERVAL = 0.005
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--inline", action="store_true", help="hash on the eventlet hub instead of the tpool")
+    args = parser.parse_args()
+
+    app = bootstrap()
+    import eventlet
+    from utils import passwords
+
+    if args.inline:
+        passwords._offload = lambda fn, *fn_args: fn(*fn_args)
+
+    with app.app_context():
+        fleet = seed_fleet(drivers=1, password_hash=passwords.hash_password(PASSWORD))
+        email = fleet["drivers"][0].email
+
+    client = app.test_client()
+    done = False
+    probe_ms, login_ms = [], []
+
+    def probe():
+        last = time.perf_counter()
+        while not done:
+            eventlet.sleep(PROBE_INTERVAL)
+            client.get(PROBE_URL)
+            now = time.perf_counter()
+            probe_ms.append((now - last - PROBE_INTERVAL) * 1000)
+            last = now
+
+    def login(_):
+        start = time.perf_counter()
+        response = client.post("/auth/login", json={"email": email, "password": PASSWORD})
+        login_ms.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    prober = eventlet.spawn(probe)
+    start = time.perf_counter()
+    list(eventlet.GreenPool(args.concurrency).imap(login, range(args.logins)))
+    elapsed = time.perf_counter() - start
+    done = True
+    prober.wait()
+
+    print(json.dumps({
+        "mode": "inline" if args.inline else "tpool",
+        "bcrypt_rounds": app.config["BCRYPT_LOG_ROUNDS"],
+        "logins_per_s": round(args.logins / elapsed, 1),
+        "login": summarize(login_ms),
+        "probe_during_storm": summarize(probe_ms),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Serialization throughput for a list of inspections, stdlib json vs orjson.
+
+Builds in-memory inspections (no database), serializes them the way the list
+endpoints do, then encodes with each JSON provider.
+
+    python -m benchmarks.bench_serialize [--count 10000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from benchmarks.common import configure_env
+
+
+def build_inspections(count, items=10, photos=2):
+    from models import InspectionResult, User
+    from models.inspection_photos import InspectionPhoto
+
+    driver = User(id=1, first_name="Bench", last_name="Driver")
+    now = datetime.now(timezone.utc)
+    inspections = []
+    for i in range(count):
+        inspection = InspectionResult(
+            id=i, driver_id=1, vehicle_id=i % 50, template_id=1, org_id=1, type="pre-trip",
+            status="pass", is_draft=False, start_mileage=1000 + i, fuel_level=50.0,
+            results={str(item): "pass" for item in range(items)}, notes="All good",
+            created_at=now - timedelta(minutes=i), driver_full_name="Bench Driver",
+        )
+        inspection.driver = driver
+        inspection.photos = [InspectionPhoto(id=i * photos + p, inspection_item_id=p, driver_id=1,
+                                             url=f"https://example.com/{i}/{p}.jpg", status="ready",
+                                             uploaded_at=now)
+                             for p in range(photos)]
+        inspections.append(inspection)
+    return inspections, {item: f"Item {item}" for item in range(items)}
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    configure_env(database=False)
+    from flask import Flask
+    from utils.json_provider import OrjsonProvider, StdlibJSONProvider, orjson
+
+    app = Flask("bench")
+    inspections, item_names = build_inspections(args.count)
+
+    build_s, payload = best_of(args.repeat, lambda: [i.to_dict(item_names=item_names) for i in inspections])
+    report = {"count": args.count, "to_dict_ms": round(build_s * 1000, 1)}
+
+    providers = {"stdlib": StdlibJSONProvider(app)}
+    if orjson is not None:
+        providers["orjson"] = OrjsonProvider(app)
+    for name, provider in providers.items():
+        encode_s, body = best_of(args.repeat, lambda: provider.dumps(payload))
+        report[name] = {
+            "encode_ms": round(encode_s * 1000, 1),
+            "total_ms": round((build_s + encode_s) * 1000, 1),
+            "inspections_per_s": round(args.count / (build_s + encode_s)),
+            "bytes": len(body),
+        }
+        assert json.loads(body)[0]["created_at"].endswith("Z")
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Per-submit query count and latency for POST /inspections/submit.
+
+Measures both paths a driver takes: submitting straight away, and submitting
+a draft created by POST /inspections/start. Only the submit request is counted.
+
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.bench_submit [--runs 200]
+"""
+import argparse
+import json
+import time
+from benchmarks.common import bearer, bootstrap, seed_fleet, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200, help="submits per path")
+    args = parser.parse_args()
+
+    app = bootstrap()
+    from sqlalchemy import event
+    from extensions import db
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        fleet = seed_fleet(vehicles=args.runs * 2)
+        headers = bearer(fleet["drivers"][0])
+        template_id = fleet["template"].id
+        results = {str(item.id): "pass" for item in fleet["items"]}
+        vehicle_ids = [v.id for v in fleet["vehicles"]]
+        engine = db.engine
+
+    client = app.test_client()
+    report = {}
+    for path, vehicles in (("direct", vehicle_ids[:args.runs]), ("from_draft", vehicle_ids[args.runs:])):
+        latencies, queries = [], []
+        for vehicle_id in vehicles:
+            body = {"template_id": template_id, "vehicle_id": vehicle_id, "type": "pre-trip",
+                    "results": results, "start_mileage": 100}
+            if path == "from_draft":
+                started = client.post("/inspections/start", headers=headers,
+                                      json={"vehicle_id": vehicle_id, "template_id": template_id})
+                body["inspection_id"] = started.get_json()["inspection_id"]
+
+            statements.clear()
+            event.listen(engine, "before_cursor_execute", record)
+            start = time.perf_counter()
+            response = client.post("/inspections/submit", headers=headers, json=body)
+            latencies.append((time.perf_counter() - start) * 1000)
+            event.remove(engine, "before_cursor_execute", record)
+            assert response.status_code == 201, response.get_data(as_text=True)
+            queries.append(len(statements))
+
+        report[path] = {**summarize(latencies), "queries_per_submit": max(queries)}
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import click
+from models.vehicle_latest_state import VehicleLatestState
+from models.idempotency_key import IdempotencyKey
+from utils import email_outbox, org_deletion
+from models.org_deletion_job import OrgDeletionJob
+
+
+def register_commands(app):
+    @app.cli.command("backfill-vehicle-state")
+    def backfill_vehicle_state():
+        """Rebuild vehicle_latest_state from inspection history."""
+        count = VehicleLatestState.backfill()
+        click.echo(f"Backfilled latest state for {count} vehicles")
+
+    @app.cli.command("purge-idempotency-keys")
+    def purge_idempotency_keys():
+        """Delete expired Idempotency-Key records (run from cron)."""
+        count = IdempotencyKey.purge_expired()
+        click.echo(f"Purged {count} expired idempotency keys")
+
+    @app.cli.command("drain-email-outbox")
+    def drain_email_outbox():
+        """Send all due messages in the email outbox."""
+        count = email_outbox.drain()
+        click.echo(f"Processed {count} outbox messages")
+
+    @app.cli.command("resume-org-deletions")
+    def resume_org_deletions():
+        """Finish organization deletion jobs interrupted by a restart."""
+        jobs = OrgDeletionJob.query.filter(OrgDeletionJob.status.in_(("queued", "running", "failed"))).all()
+        failed = 0
+        for job in jobs:
+            click.echo(f"Resuming deletion of organization {job.org_id} (job {job.id})")
+            if not org_deletion.run_or_fail(job.id):
+                failed += 1
+                click.echo(f"Job {job.id} failed; it is marked failed and will be retried on the next run")
+        click.echo(f"Resumed {len(jobs)} jobs ({failed} failed)")
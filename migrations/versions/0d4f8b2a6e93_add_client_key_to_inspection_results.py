@@ -0,0 +1,43 @@
+"""add client_key to inspection_results for batch submits
+
+Revision ID: 0d4f8b2a6e93
+Revises: c5a09e71b3f2
+Create Date: 2026-10-18 12:14:55.310962
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0d4f8b2a6e93'
+down_revision = 'c5a09e71b3f2'
+branch_labels = None
+depends_on = None
+
+schema_name = 'inspection_app'
+
+
+def upgrade():
+    op.add_column(
+        'inspection_results',
+        sa.Column('client_key', sa.String(length=64), nullable=True),
+        schema=schema_name
+    )
+    op.create_index(
+        'uq_inspection_results_driver_id_client_key',
+        'inspection_results',
+        ['driver_id', 'client_key'],
+        unique=True,
+        schema=schema_name,
+        postgresql_where=sa.text('client_key IS NOT NULL')
+    )
+
+
+def downgrade():
+    op.drop_index(
+        'uq_inspection_results_driver_id_client_key',
+        table_name='inspection_results',
+        schema=schema_name
+    )
+    op.drop_column('inspection_results', 'client_key', schema=schema_name)
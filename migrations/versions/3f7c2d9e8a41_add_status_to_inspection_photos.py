@@ -0,0 +1,49 @@
+"""add status to inspection_photos for background uploads
+
+Revision ID: 3f7c2d9e8a41
+Revises: aabd5197ce12
+Create Date: 2026-10-18 10:03:17.518224
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7c2d9e8a41'
+down_revision = 'aabd5197ce12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'inspection_photos',
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='ready'),
+        schema='inspection_app'
+    )
+    op.alter_column(
+        'inspection_photos',
+        'status',
+        server_default=None,
+        schema='inspection_app'
+    )
+    op.alter_column(
+        'inspection_photos',
+        'photo_url',
+        existing_type=sa.String(length=255),
+        nullable=True,
+        schema='inspection_app'
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM inspection_app.inspection_photos WHERE photo_url IS NULL")
+    op.alter_column(
+        'inspection_photos',
+        'photo_url',
+        existing_type=sa.String(length=255),
+        nullable=False,
+        schema='inspection_app'
+    )
+    op.drop_column('inspection_photos', 'status', schema='inspection_app')
@@ -0,0 +1,48 @@
+"""add email_outbox table
+
+Revision ID: 4a7e2c9b1d58
+Revises: 6b92e4d1f0a5
+Create Date: 2026-10-18 16:41:12.503918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a7e2c9b1d58'
+down_revision = '6b92e4d1f0a5'
+branch_labels = None
+depends_on = None
+
+schema_name = 'inspection_app'
+
+
+def upgrade():
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('to_email', sa.String(length=255), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('html_content', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        schema=schema_name
+    )
+    op.create_index(
+        'ix_email_outbox_pending_next_attempt_at',
+        'email_outbox',
+        ['next_attempt_at'],
+        schema=schema_name,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_email_outbox_pending_next_attempt_at', table_name='email_outbox', schema=schema_name)
+    op.drop_table('email_outbox', schema=schema_name)
@@ -0,0 +1,45 @@
+"""add idempotency_keys table
+
+Revision ID: 6b92e4d1f0a5
+Revises: 0d4f8b2a6e93
+Create Date: 2026-10-18 13:02:39.845120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b92e4d1f0a5'
+down_revision = '0d4f8b2a6e93'
+branch_labels = None
+depends_on = None
+
+schema_name = 'inspection_app'
+
+
+def upgrade():
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=128), nullable=False),
+        sa.Column('endpoint', sa.String(length=100), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('response', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_id_key'),
+        schema=schema_name
+    )
+    op.create_index(
+        'ix_idempotency_keys_expires_at',
+        'idempotency_keys',
+        ['expires_at'],
+        schema=schema_name
+    )
+
+
+def downgrade():
+    op.drop_index('ix_idempotency_keys_expires_at', table_name='idempotency_keys', schema=schema_name)
+    op.drop_table('idempotency_keys', schema=schema_name)
@@ -0,0 +1,28 @@
+"""add thumbnails to inspection_photos
+
+Revision ID: 8e1b6f04c2d7
+Revises: 3f7c2d9e8a41
+Create Date: 2026-10-18 10:41:52.093318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e1b6f04c2d7'
+down_revision = '3f7c2d9e8a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'inspection_photos',
+        sa.Column('thumbnails', sa.JSON(), nullable=True),
+        schema='inspection_app'
+    )
+
+
+def downgrade():
+    op.drop_column('inspection_photos', 'thumbnails', schema='inspection_app')
@@ -0,0 +1,50 @@
+"""add org_deletion_jobs table and indexes for bulk org deletion
+
+Revision ID: 9d3f6a0c2e71
+Revises: 4a7e2c9b1d58
+Create Date: 2026-10-18 17:20:45.118236
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3f6a0c2e71'
+down_revision = '4a7e2c9b1d58'
+branch_labels = None
+depends_on = None
+
+schema_name = 'inspection_app'
+
+
+def upgrade():
+    op.create_table(
+        'org_deletion_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+        sa.Column('step', sa.String(length=50), nullable=True),
+        sa.Column('progress', sa.JSON(), nullable=False, server_default='{}'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        schema=schema_name
+    )
+    op.create_index('ix_org_deletion_jobs_org_id', 'org_deletion_jobs', ['org_id'], schema=schema_name)
+
+    # Detaching inspections from a template and cascading template item deletes
+    # to photos both look rows up by these columns. aabd5197ce12 creates them
+    # now; this only covers databases that ran it before they were added there.
+    op.create_index('ix_inspection_results_template_id', 'inspection_results', ['template_id'],
+                    schema=schema_name, if_not_exists=True)
+    op.create_index('ix_inspection_photos_inspection_item_id', 'inspection_photos', ['inspection_item_id'],
+                    schema=schema_name, if_not_exists=True)
+
+
+def downgrade():
+    # The template_id / inspection_item_id indexes belong to aabd5197ce12
+    op.drop_index('ix_org_deletion_jobs_org_id', table_name='org_deletion_jobs', schema=schema_name)
+    op.drop_table('org_deletion_jobs', schema=schema_name)
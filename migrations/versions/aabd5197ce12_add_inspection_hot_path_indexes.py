@@ -0,0 +1,60 @@
+"""add indexes for inspection hot-path filters and foreign keys
+
+Revision ID: aabd5197ce12
+Revises: ef455f9bf05e
+Create Date: 2026-10-18 09:12:41.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'aabd5197ce12'
+down_revision = 'ef455f9bf05e'
+branch_labels = None
+depends_on = None
+
+schema_name = 'inspection_app'
+
+# (index name, table, columns, partial-index predicate)
+INDEXES = [
+    # Admin history / keyset pagination: org_id + is_draft filter, newest first
+    ('ix_inspection_results_org_id_is_draft_created_at', 'inspection_results',
+     ['org_id', 'is_draft', 'created_at', 'id'], None),
+    # start_inspection: last submitted inspection per driver/vehicle
+    ('ix_inspection_results_driver_id_vehicle_id_is_draft', 'inspection_results',
+     ['driver_id', 'vehicle_id', 'is_draft', 'created_at'], None),
+    # get_last_inspection / InspectionResult.last_for_vehicle
+    ('ix_inspection_results_vehicle_id_created_at', 'inspection_results',
+     ['vehicle_id', 'created_at'], None),
+    # Draft lookups and cleanup in submit_inspection / start_inspection
+    ('ix_inspection_results_drafts', 'inspection_results',
+     ['driver_id', 'vehicle_id', 'template_id'], sa.text('is_draft')),
+    # Foreign keys; template_id and inspection_item_id are also what org deletion
+    # and template item deletes look rows up by
+    ('ix_user_org_id', 'user', ['org_id'], None),
+    ('ix_vehicles_org_id', 'vehicles', ['org_id'], None),
+    ('ix_templates_org_id', 'templates', ['org_id'], None),
+    ('ix_inspection_results_template_id', 'inspection_results', ['template_id'], None),
+    ('ix_template_items_template_id', 'template_items', ['template_id'], None),
+    ('ix_inspection_photos_inspection_id', 'inspection_photos', ['inspection_id'], None),
+    ('ix_inspection_photos_inspection_item_id', 'inspection_photos', ['inspection_item_id'], None),
+]
+
+
+def upgrade():
+    for name, table, columns, where in INDEXES:
+        op.create_index(
+            name,
+            table,
+            columns,
+            unique=False,
+            schema=schema_name,
+            postgresql_where=where
+        )
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, schema=schema_name)
@@ -0,0 +1,52 @@
+"""add vehicle_latest_state table
+
+Revision ID: c5a09e71b3f2
+Revises: 8e1b6f04c2d7
+Create Date: 2026-10-18 11:26:08.771402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a09e71b3f2'
+down_revision = '8e1b6f04c2d7'
+branch_labels = None
+depends_on = None
+
+schema_name = 'inspection_app'
+
+
+def upgrade():
+    op.create_table(
+        'vehicle_latest_state',
+        sa.Column('vehicle_id', sa.Integer(), sa.ForeignKey(f'{schema_name}.vehicles.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('inspection_id', sa.Integer(), sa.ForeignKey(f'{schema_name}.inspection_results.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('org_id', sa.Integer(), nullable=True),
+        sa.Column('driver_id', sa.Integer(), nullable=True),
+        sa.Column('type', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('start_mileage', sa.Integer(), nullable=True),
+        sa.Column('fuel_level', sa.Float(), nullable=True),
+        sa.Column('inspected_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        schema=schema_name
+    )
+    # Populate from existing history; later kept current by submit/update
+    op.execute("""
+        INSERT INTO inspection_app.vehicle_latest_state
+            (vehicle_id, inspection_id, org_id, driver_id, type, status,
+             start_mileage, fuel_level, inspected_at, updated_at)
+        SELECT DISTINCT ON (ir.vehicle_id)
+            ir.vehicle_id, ir.id, ir.org_id, ir.driver_id, ir.type, ir.status,
+            ir.start_mileage, ir.fuel_level, ir.created_at, now()
+        FROM inspection_app.inspection_results ir
+        JOIN inspection_app.vehicles v ON v.id = ir.vehicle_id
+        WHERE ir.is_draft = false
+        ORDER BY ir.vehicle_id, ir.created_at DESC, ir.id DESC
+    """)
+
+
+def downgrade():
+    op.drop_table('vehicle_latest_state', schema=schema_name)
@@ -0,0 +1,26 @@
+"""add locked_at lease to idempotency_keys
+
+Revision ID: c81f5e2d7a40
+Revises: 9d3f6a0c2e71
+Create Date: 2026-10-18 19:05:12.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81f5e2d7a40'
+down_revision = '9d3f6a0c2e71'
+branch_labels = None
+depends_on = None
+
+schema_name = 'inspection_app'
+
+
+def upgrade():
+    op.add_column('idempotency_keys', sa.Column('locked_at', sa.DateTime(), nullable=True), schema=schema_name)
+
+
+def downgrade():
+    op.drop_column('idempotency_keys', 'locked_at', schema=schema_name)
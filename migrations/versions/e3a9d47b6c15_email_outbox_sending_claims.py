@@ -0,0 +1,42 @@
+"""index email_outbox rows claimed as sending alongside pending ones
+
+Revision ID: e3a9d47b6c15
+Revises: c81f5e2d7a40
+Create Date: 2026-10-18 19:41:27.583904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9d47b6c15'
+down_revision = 'c81f5e2d7a40'
+branch_labels = None
+depends_on = None
+
+schema_name = 'inspection_app'
+
+
+def upgrade():
+    # The dispatcher also picks up "sending" rows whose claim lapsed
+    op.create_index(
+        'ix_email_outbox_due_next_attempt_at',
+        'email_outbox',
+        ['next_attempt_at'],
+        schema=schema_name,
+        postgresql_where=sa.text("status IN ('pending', 'sending')")
+    )
+    op.drop_index('ix_email_outbox_pending_next_attempt_at', table_name='email_outbox', schema=schema_name)
+
+
+def downgrade():
+    op.execute(f"UPDATE {schema_name}.email_outbox SET status = 'pending' WHERE status = 'sending'")
+    op.create_index(
+        'ix_email_outbox_pending_next_attempt_at',
+        'email_outbox',
+        ['next_attempt_at'],
+        schema=schema_name,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+    op.drop_index('ix_email_outbox_due_next_attempt_at', table_name='email_outbox', schema=schema_name)
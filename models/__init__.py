@@ -5,6 +5,10 @@ from .organization import Organization
 from .template import Template
 from .template_item import TemplateItem
 from .password_reset_token import PasswordResetToken
+from .vehicle_latest_state import VehicleLatestState
+from .idempotency_key import IdempotencyKey
+from .email_outbox import EmailOutbox
+from .org_deletion_job import OrgDeletionJob
 from extensions import db
 
 User.password_reset_tokens = db.relationship(
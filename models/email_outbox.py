@@ -0,0 +1,45 @@
+from extensions import db
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+
+class EmailOutbox(db.Model):
+    """Outgoing email, written in the same transaction as the change that triggers it
+    and delivered later by utils.email_outbox."""
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        # The dispatcher only ever scans due rows that are pending or whose claim lapsed
+        db.Index(
+            "ix_email_outbox_due_next_attempt_at", "next_attempt_at",
+            postgresql_where=text("status IN ('pending', 'sending')"),
+        ),
+        {"schema": "inspection_app"},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # e.g. "password_reset"
+    to_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html_content = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def mark_sent(self):
+        self.status = "sent"
+        self.sent_at = datetime.utcnow()
+        self.last_error = None
+
+    def mark_failed_attempt(self, error, max_attempts, backoff_seconds):
+        """Schedule a retry with exponential backoff, or give up after max_attempts."""
+        self.attempts += 1
+        self.last_error = str(error)[:2000]
+        if self.attempts >= max_attempts:
+            self.status = "failed"
+        else:
+            self.status = "pending"
+            delay = min(backoff_seconds * (2 ** (self.attempts - 1)), 3600)
+            self.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
@@ -0,0 +1,27 @@
+from extensions import db
+from datetime import datetime
+
+
+class IdempotencyKey(db.Model):
+    """Stored response for a write request made with an Idempotency-Key header."""
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+        {"schema": "inspection_app"},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    key = db.Column(db.String(128), nullable=False)
+    endpoint = db.Column(db.String(100), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)  # NULL while the first request is in flight
+    locked_at = db.Column(db.DateTime, nullable=True)  # lease held by the in-flight request
+    response = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    @staticmethod
+    def purge_expired():
+        count = IdempotencyKey.query.filter(IdempotencyKey.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+        db.session.commit()
+        return count
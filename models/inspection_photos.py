@@ -1,5 +1,6 @@
 from extensions import db
 from datetime import datetime, timezone
+from utils.serializers import compile_serializer
 
 class InspectionPhoto(db.Model):
     __tablename__ = "inspection_photos"
@@ -12,6 +13,7 @@ class InspectionPhoto(db.Model):
         db.Integer,
         db.ForeignKey('inspection_app.inspection_results.id', ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     inspection = db.relationship("InspectionResult", backref="photos", lazy="joined")
 
@@ -20,6 +22,7 @@ class InspectionPhoto(db.Model):
         db.Integer,
         db.ForeignKey('inspection_app.template_items.id', ondelete="CASCADE"),
         nullable=True,
+        index=True,
     )
     inspection_item = db.relationship("TemplateItem", backref="photos", lazy="joined")
 
@@ -31,21 +34,25 @@ class InspectionPhoto(db.Model):
     )
     driver = db.relationship("User", backref="uploaded_photos", lazy="joined")
 
-    # Storage URL and timestamps
-    url = db.Column('photo_url', db.String(255), nullable=False)
+    # Storage URL and timestamps; url stays empty while a background upload is pending
+    url = db.Column('photo_url', db.String(255), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="ready")  # pending, ready, failed
+    thumbnails = db.Column(db.JSON, nullable=True)  # {"320": url, ...} keyed by max edge in px
     uploaded_at = db.Column('created_at', db.DateTime(timezone=True), default=datetime.now(timezone.utc))
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "inspection_id": self.inspection_id,
-            "inspection_item_id": self.inspection_item_id,
-            "driver_id": self.driver_id,
-            "driver": {
-                "id": self.driver.id,
-                "first_name": self.driver.first_name,
-                "last_name": self.driver.last_name,
-            } if self.driver else None,
-            "url": self.url,
-            "uploaded_at": self.uploaded_at.isoformat() + "Z" if self.uploaded_at else None,
-        }
+        return _serialize_photo(self)
+
+
+def _photo_driver(photo):
+    driver = photo.driver
+    if driver is None:
+        return None
+    return {"id": driver.id, "first_name": driver.first_name, "last_name": driver.last_name}
+
+
+_serialize_photo = compile_serializer(
+    ("id", "inspection_id", "inspection_item_id", "driver_id", "url", "status", "uploaded_at"),
+    driver=_photo_driver,
+    thumbnails=lambda photo: photo.thumbnails or {},
+)
@@ -1,18 +1,29 @@
 from extensions import db
 from datetime import datetime, timezone
+from sqlalchemy import select, null, tuple_
 from sqlalchemy.sql import func
-from sqlalchemy.orm import validates
+from sqlalchemy.orm import validates, joinedload, lazyload, selectinload
+from utils.serializers import compile_serializer
 
 
 class InspectionResult(db.Model):
     __tablename__ = 'inspection_results'
-    __table_args__ = {"schema": "inspection_app"}
+    __table_args__ = (
+        db.Index("ix_inspection_results_org_id_is_draft_created_at", "org_id", "is_draft", "created_at", "id"),
+        db.Index("ix_inspection_results_driver_id_vehicle_id_is_draft", "driver_id", "vehicle_id", "is_draft", "created_at"),
+        db.Index("ix_inspection_results_vehicle_id_created_at", "vehicle_id", "created_at"),
+        db.Index("ix_inspection_results_drafts", "driver_id", "vehicle_id", "template_id",
+                 postgresql_where=db.text("is_draft")),
+        db.Index("uq_inspection_results_driver_id_client_key", "driver_id", "client_key", unique=True,
+                 postgresql_where=db.text("client_key IS NOT NULL")),
+        {"schema": "inspection_app"},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     driver_id = db.Column(db.Integer, db.ForeignKey('inspection_app.user.id', ondelete='SET NULL'), nullable=True)
     driver = db.relationship("User", backref=db.backref("inspections", passive_deletes=True), lazy="joined")
     vehicle_id = db.Column(db.Integer, db.ForeignKey('inspection_app.vehicles.id', ondelete="SET NULL"), nullable=True)
-    template_id = db.Column(db.Integer, db.ForeignKey('inspection_app.templates.id'), nullable=True)
+    template_id = db.Column(db.Integer, db.ForeignKey('inspection_app.templates.id'), nullable=True, index=True)
     template = db.relationship("Template", backref="inspection_results", lazy="joined")
     org_id = db.Column(db.Integer, db.ForeignKey('inspection_app.organizations.id'), nullable=True)
     type = db.Column(db.String(50), nullable=False)  # "pre-trip", "post-trip"
@@ -31,24 +42,127 @@ class InspectionResult(db.Model):
     driver_first_name = db.Column(db.String(50), nullable=True)
     driver_last_name = db.Column(db.String(50), nullable=True)
     driver_full_name = db.Column(db.String(100), nullable=True)
+    client_key = db.Column(db.String(64), nullable=True)  # idempotency key from offline batch submits
 
 
     @staticmethod
     def last_for_vehicle(vehicle_id):
+        from models.vehicle_latest_state import VehicleLatestState
+
+        state = db.session.get(VehicleLatestState, vehicle_id)
+        if state and state.inspection:
+            return state.inspection
+        # No state yet, or its inspection was deleted (inspection_id is SET NULL)
         return (InspectionResult.query
-                .filter_by(vehicle_id=vehicle_id)
+                .filter_by(vehicle_id=vehicle_id, is_draft=False)
                 .order_by(InspectionResult.created_at.desc())
                 .first())
 
     def fuel_used_since_last(self):
+        # Compare against the previous submitted inspection, not this one
         last_inspection = (InspectionResult.query
-                           .filter_by(vehicle_id=self.vehicle_id)
+                           .filter(InspectionResult.vehicle_id == self.vehicle_id,
+                                   InspectionResult.id != self.id,
+                                   InspectionResult.is_draft == False,
+                                   InspectionResult.created_at < self.created_at)
                            .order_by(InspectionResult.created_at.desc())
                            .first())
         if not last_inspection or self.fuel_level is None or last_inspection.fuel_level is None:
             return None
         return last_inspection.fuel_level - self.fuel_level
 
+    @staticmethod
+    def fleet_stats(org_id, start=None, end=None, bucket=None):
+        """Per-vehicle and per-driver aggregates for an org in one grouped query.
+
+        Mileage and fuel deltas are taken against the vehicle's previous inspection
+        with window functions, so the first inspection in the range still gets a delta.
+        Returns (vehicle_rows, driver_rows) as lists of mappings.
+        """
+        ir = InspectionResult
+        window = {"partition_by": ir.vehicle_id, "order_by": (ir.created_at, ir.id)}
+        ordered = (select(
+                ir.vehicle_id,
+                ir.driver_id,
+                ir.status,
+                ir.created_at,
+                ir.start_mileage,
+                ir.fuel_level,
+                func.lag(ir.start_mileage).over(**window).label("prev_mileage"),
+                func.lag(ir.fuel_level).over(**window).label("prev_fuel"),
+                (func.date_trunc(bucket, ir.created_at) if bucket else null()).label("bucket"),
+            )
+            .where(ir.org_id == org_id, ir.is_draft == False))
+        if end:
+            ordered = ordered.where(ir.created_at < end)
+        o = ordered.subquery()
+
+        mileage_delta = o.c.start_mileage - o.c.prev_mileage
+        fuel_used = o.c.prev_fuel - o.c.fuel_level
+        failures = func.count().filter(o.c.status.in_(("fail", "needs_repair")))
+        stmt = (select(
+                func.grouping(o.c.vehicle_id).label("by_driver"),
+                o.c.vehicle_id,
+                o.c.driver_id,
+                o.c.bucket,
+                func.count().label("inspections"),
+                failures.label("failures"),
+                func.max(o.c.created_at).label("last_inspection_at"),
+                func.coalesce(func.sum(mileage_delta).filter(mileage_delta > 0), 0).label("miles"),
+                func.coalesce(func.sum(fuel_used).filter(fuel_used > 0), 0).label("fuel_used"),
+            )
+            .group_by(func.grouping_sets(tuple_(o.c.vehicle_id, o.c.bucket), tuple_(o.c.driver_id, o.c.bucket)))
+            .order_by(o.c.bucket, o.c.vehicle_id, o.c.driver_id))
+        if start:
+            stmt = stmt.where(o.c.created_at >= start)
+
+        vehicles, drivers = [], []
+        for row in db.session.execute(stmt).mappings():
+            (drivers if row["by_driver"] else vehicles).append(row)
+        return vehicles, drivers
+
+    @staticmethod
+    def bulk_load_options():
+        """Loader options that fetch everything to_dict() needs for a page of inspections
+        in a fixed number of queries instead of lazy loads per row."""
+        from models.inspection_photos import InspectionPhoto
+        from models.user import User
+
+        # Template item names come from utils.template_cache, so items are not loaded here
+        return (
+            joinedload(InspectionResult.driver).lazyload(User.org),
+            selectinload(InspectionResult.template),
+            selectinload(InspectionResult.photos).options(
+                joinedload(InspectionPhoto.driver).lazyload(User.org),
+                lazyload(InspectionPhoto.inspection),
+                lazyload(InspectionPhoto.inspection_item),
+            ),
+        )
+
+    @staticmethod
+    def serialize_many(inspections, item_names_cache=None):
+        """Serialize a list of inspections, building each template's item-name map once."""
+        from utils import template_cache
+
+        cache = item_names_cache if item_names_cache is not None else {}
+        wanted = {(insp.template_id, insp.template.version)
+                  for insp in inspections if insp.template and insp.template_id not in cache}
+        if wanted:
+            cache.update(template_cache.item_names_many(wanted))
+        return [insp.to_dict(item_names=insp.template_item_names(cache)) for insp in inspections]
+
+    def template_item_names(self, cache=None):
+        from utils import template_cache
+
+        if not self.template:
+            return {}
+        if cache is not None and self.template_id in cache:
+            return cache[self.template_id]
+        names = template_cache.item_names(self.template_id, self.template.version)
+        if cache is not None:
+            cache[self.template_id] = names
+        return names
+
     @validates("start_mileage")
     def validate_mileage(self, key, value):
         """Ensure start_mileage is always present."""
@@ -56,7 +170,7 @@ class InspectionResult(db.Model):
             raise ValueError("All inspections must include start_mileage.")
         return value
 
-    def to_dict(self):
+    def to_dict(self, item_names=None):
         driver_info = None
         if self.driver:
             driver_info = {
@@ -75,7 +189,7 @@ class InspectionResult(db.Model):
 
         enriched_results = {}
         if self.results:
-            template_items = {item.id: item.name for item in self.template.items} if self.template else {}
+            template_items = item_names if item_names is not None else self.template_item_names()
             for item_id, answer in self.results.items():
                 item_name = template_items.get(int(item_id), item_id)  # fallback to id if name not found
                 enriched_results[item_id] = {
@@ -83,28 +197,17 @@ class InspectionResult(db.Model):
                     "answer": answer
                 }
 
-        return {
-            "id": self.id,
-            "driver_id": self.driver_id,
-            "vehicle_id": self.vehicle_id,
-            "template_id": self.template_id,
-            "org_id": self.org_id,
-            "type": self.type,
-            "results": enriched_results,
-            "status": self.status,
-            "notes": self.notes,
-            "is_draft": self.is_draft,
-            "start_mileage": self.start_mileage,
-            "odometer_verified": self.odometer_verified,
-            "fuel_level": self.fuel_level,
-            "fuel_notes": self.fuel_notes,
-            "location": self.location,
-            "completed_at": self.completed_at.isoformat() + "Z" if self.completed_at else None,
-            "created_at": self.created_at.isoformat() + "Z" if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() + "Z" if self.updated_at else None,
-            "driver_first_name": self.driver_first_name,
-            "driver_last_name": self.driver_last_name,
-            "driver_full_name": self.driver_full_name,
-            "driver": driver_info,
-            "photos": [photo.to_dict() for photo in self.photos] if self.photos else [],
-        }
\ No newline at end of file
+        data = _serialize_inspection(self)
+        data["results"] = enriched_results
+        data["driver"] = driver_info
+        data["photos"] = [photo.to_dict() for photo in self.photos] if self.photos else []
+        return data
+
+
+# Timestamps stay datetimes; the app's JSON provider writes them as ISO 8601 UTC ("...Z")
+_serialize_inspection = compile_serializer((
+    "id", "driver_id", "vehicle_id", "template_id", "org_id", "type", "status", "notes",
+    "is_draft", "start_mileage", "odometer_verified", "fuel_level", "fuel_notes", "location",
+    "completed_at", "created_at", "updated_at",
+    "driver_first_name", "driver_last_name", "driver_full_name",
+))
\ No newline at end of file
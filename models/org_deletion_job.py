@@ -0,0 +1,33 @@
+from extensions import db
+from datetime import datetime
+
+
+class OrgDeletionJob(db.Model):
+    """Progress of a background organization deletion (see utils.org_deletion)."""
+    __tablename__ = 'org_deletion_jobs'
+    __table_args__ = {"schema": "inspection_app"}
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Not a foreign key: the organization row is gone once the job finishes
+    org_id = db.Column(db.Integer, nullable=False, index=True)
+    requested_by = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, done, failed
+    step = db.Column(db.String(50), nullable=True)
+    progress = db.Column(db.JSON, nullable=False, default=dict)  # {step: rows affected}
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "org_id": self.org_id,
+            "status": self.status,
+            "step": self.step,
+            "progress": self.progress or {},
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -1,5 +1,6 @@
 from extensions import db
 from datetime import datetime
+from sqlalchemy import event, func, inspect
 
 class Template(db.Model):
     __tablename__ = 'templates'
@@ -8,7 +9,7 @@ class Template(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     created_by = db.Column(db.Integer, db.ForeignKey('inspection_app.user.id', ondelete='SET NULL'), nullable=True)
-    org_id = db.Column(db.Integer, db.ForeignKey('inspection_app.organizations.id'), nullable=True)
+    org_id = db.Column(db.Integer, db.ForeignKey('inspection_app.organizations.id'), nullable=True, index=True)
     items = db.relationship('TemplateItem', backref='template', cascade="all, delete-orphan")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_default = db.Column(db.Boolean, default=False)
@@ -31,3 +32,18 @@ class Template(db.Model):
             "version": self.version,
             "is_active": self.is_active
         }
+
+
+# Columns to_dict() serializes; utils.template_cache keys entries by (id, version)
+VERSIONED_COLUMNS = ("name", "description", "created_by", "org_id", "is_default", "is_active")
+
+
+@event.listens_for(Template, "before_update")
+def _bump_version(mapper, connection, template):
+    # Any ORM change to a cached column (e.g. moving a template to another org)
+    # gets a new version unless the caller already set one, as edit_template does
+    state = inspect(template)
+    if state.attrs.version.history.has_changes():
+        return
+    if any(state.attrs[column].history.has_changes() for column in VERSIONED_COLUMNS):
+        template.version = func.coalesce(Template.version, 1) + 1
@@ -8,7 +8,7 @@ class TemplateItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     question = db.Column(db.String(255), nullable=False)
-    template_id = db.Column(db.Integer, db.ForeignKey('inspection_app.templates.id'), nullable=False)
+    template_id = db.Column(db.Integer, db.ForeignKey('inspection_app.templates.id'), nullable=False, index=True)
     description = db.Column(db.Text, nullable=True)
     required = db.Column(db.Boolean, default=False)
     order = db.Column(db.Integer, nullable=True)
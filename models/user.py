@@ -12,7 +12,7 @@ class User(db.Model):
     role = db.Column(db.String(20), default="driver")  # roles: driver, admin
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
-    org_id = db.Column(db.Integer, db.ForeignKey('inspection_app.organizations.id'), nullable=True)
+    org_id = db.Column(db.Integer, db.ForeignKey('inspection_app.organizations.id'), nullable=True, index=True)
     first_name = db.Column(db.String(30), nullable=False)
     last_name = db.Column(db.String(30), nullable=False)
     phone_number = db.Column(db.String(15), nullable=True)
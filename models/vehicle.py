@@ -6,7 +6,7 @@ class Vehicle(db.Model):
     __table_args__ = {"schema": "inspection_app"}
 
     id = db.Column(db.Integer, primary_key=True)
-    org_id = db.Column(db.Integer, db.ForeignKey('inspection_app.organizations.id'), nullable=True)
+    org_id = db.Column(db.Integer, db.ForeignKey('inspection_app.organizations.id'), nullable=True, index=True)
     number = db.Column(db.String(50), nullable=True)
     make = db.Column(db.String(20), nullable=True)
     model = db.Column(db.String(20), nullable=True)
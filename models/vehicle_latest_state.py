@@ -0,0 +1,94 @@
+from extensions import db
+from datetime import datetime
+from sqlalchemy import or_, text
+from sqlalchemy.dialects.postgresql import insert
+
+
+class VehicleLatestState(db.Model):
+    """Denormalized copy of each vehicle's newest submitted inspection."""
+    __tablename__ = 'vehicle_latest_state'
+    __table_args__ = {"schema": "inspection_app"}
+
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('inspection_app.vehicles.id', ondelete='CASCADE'), primary_key=True)
+    inspection_id = db.Column(db.Integer, db.ForeignKey('inspection_app.inspection_results.id', ondelete='SET NULL'), nullable=True)
+    inspection = db.relationship("InspectionResult", lazy="joined")
+    org_id = db.Column(db.Integer, nullable=True)
+    driver_id = db.Column(db.Integer, nullable=True)
+    type = db.Column(db.String(50), nullable=True)
+    status = db.Column(db.String(20), nullable=True)
+    start_mileage = db.Column(db.Integer, nullable=True)
+    fuel_level = db.Column(db.Float, nullable=True)
+    inspected_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @staticmethod
+    def record(inspection):
+        """Upsert the vehicle's state from a submitted inspection inside the caller's transaction.
+
+        Older inspections never overwrite newer state, except when re-recording the
+        inspection the state already points at (e.g. after an edit).
+        """
+        if not inspection.vehicle_id or inspection.is_draft:
+            return
+        if inspection.id is None:
+            db.session.flush()
+
+        VehicleLatestState.upsert([{
+            "vehicle_id": inspection.vehicle_id,
+            "inspection_id": inspection.id,
+            "org_id": inspection.org_id,
+            "driver_id": inspection.driver_id,
+            "type": inspection.type,
+            "status": inspection.status,
+            "start_mileage": inspection.start_mileage,
+            "fuel_level": inspection.fuel_level,
+            "inspected_at": inspection.created_at,
+        }])
+
+    @staticmethod
+    def upsert(rows):
+        """Multi-row form of record() taking column dicts (one per vehicle)."""
+        if not rows:
+            return
+        now = datetime.utcnow()
+        rows = [dict(row, updated_at=now) for row in rows]
+        table = VehicleLatestState.__table__
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.vehicle_id],
+            set_={key: stmt.excluded[key] for key in rows[0] if key != "vehicle_id"},
+            where=or_(
+                table.c.inspected_at.is_(None),
+                table.c.inspected_at <= stmt.excluded.inspected_at,
+                table.c.inspection_id == stmt.excluded.inspection_id,
+            ),
+        )
+        db.session.execute(stmt)
+
+    @staticmethod
+    def backfill():
+        """Rebuild every vehicle's state from inspection history. Returns rows written."""
+        result = db.session.execute(text("""
+            INSERT INTO inspection_app.vehicle_latest_state
+                (vehicle_id, inspection_id, org_id, driver_id, type, status,
+                 start_mileage, fuel_level, inspected_at, updated_at)
+            SELECT DISTINCT ON (ir.vehicle_id)
+                ir.vehicle_id, ir.id, ir.org_id, ir.driver_id, ir.type, ir.status,
+                ir.start_mileage, ir.fuel_level, ir.created_at, now()
+            FROM inspection_app.inspection_results ir
+            JOIN inspection_app.vehicles v ON v.id = ir.vehicle_id
+            WHERE ir.is_draft = false
+            ORDER BY ir.vehicle_id, ir.created_at DESC, ir.id DESC
+            ON CONFLICT (vehicle_id) DO UPDATE SET
+                inspection_id = EXCLUDED.inspection_id,
+                org_id = EXCLUDED.org_id,
+                driver_id = EXCLUDED.driver_id,
+                type = EXCLUDED.type,
+                status = EXCLUDED.status,
+                start_mileage = EXCLUDED.start_mileage,
+                fuel_level = EXCLUDED.fuel_level,
+                inspected_at = EXCLUDED.inspected_at,
+                updated_at = EXCLUDED.updated_at
+        """))
+        db.session.commit()
+        return result.rowcount
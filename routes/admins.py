@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, get_current_user
 from extensions import db, bcrypt
 from models.user import User
 import re
 from models.organization import Organization
+from utils.user_cache import invalidate_user
+from sockets.org_events import evict_user
 import secrets
 
 admins_bp = Blueprint("admins", __name__)
@@ -74,17 +76,15 @@ admins_bp = Blueprint("admins", __name__)
 def redeem_admin_invite():
     current_app.logger.debug("redeem_admin_invite() called")
     current_app.logger.debug(f"JWT identity: {get_jwt_identity()}")
-    current_app.logger.debug(f"Request JSON: {request.get_json()}")
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     data = request.get_json()
     code = data.get("code", "").strip()
-    print(f"Received code from client: '{code}'")
 
     if not code:
         return jsonify({"error": "Code is required"}), 400
 
     org = Organization.query.filter_by(admin_invite_code=code).first()
-    print(f"Looking for org with admin_invite_code='{code}', found: {org}")  # DEBUG
+    current_app.logger.debug(f"Admin invite code lookup found org: {org}")
 
     if not org:
         return jsonify({"error": "Invalid code"}), 400
@@ -96,6 +96,8 @@ def redeem_admin_invite():
     # Optional: invalidate the code
     org.admin_invite_code = None
     db.session.commit()
+    invalidate_user(user.id)
+    evict_user(user.id)
 
     return jsonify({"message": "You are now an admin", "org_id": org.id}), 200
 
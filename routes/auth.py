@@ -1,12 +1,14 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
-from extensions import db, bcrypt
+from extensions import db
 from models.user import User
 from models.password_reset_token import PasswordResetToken
 import re
 import uuid
 from datetime import datetime, timedelta
-from utils.email_service import send_reset_email
+from utils.email_service import queue_reset_email
+from utils import email_outbox
+from utils.passwords import hash_password, check_password, needs_rehash
 
 
 auth_bp = Blueprint("auth", __name__)
@@ -38,7 +40,7 @@ def register():
     if not first_name or not last_name:
         return jsonify({"error": "First and Last Names are required"})
 
-    password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+    password_hash = hash_password(password)
 
     new_user = User(
         email=email,
@@ -77,9 +79,14 @@ def login():
         return jsonify({"error": "Email and password are required"}), 400
 
     user = User.query.filter_by(email=email).first()
-    if not user or not bcrypt.check_password_hash(user.password_hash, password):
+    if not user or not check_password(user.password_hash, password):
         return jsonify({"error": "Invalid credentials"}), 401
 
+    # Upgrade hashes made with an older BCRYPT_LOG_ROUNDS while we have the plaintext
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(password)
+        db.session.commit()
+
     # Dynamic role: driver if not in org
     role = 'driver' if not user.org_id else user.role
 
@@ -132,14 +139,12 @@ def request_password_reset():
     )
 
     db.session.add(reset_entry)
+    # Written in the same commit as the token; delivered in the background
+    queue_reset_email(user.email, token)
     db.session.commit()
+    email_outbox.wake()
 
-    email_sent = send_reset_email(user.email, token)
-
-    if email_sent:
-        return jsonify({"message": "If an account exists, a reset link has been sent."}), 200
-    else:
-        return jsonify({"error": "Unable to send reset email"}), 500
+    return jsonify({"message": "If an account exists, a reset link has been sent."}), 200
 
 
 @auth_bp.get("/reset-password")
@@ -203,7 +208,7 @@ def reset_password():
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    user.password_hash = bcrypt.generate_password_hash(new_password).decode("utf-8")
+    user.password_hash = hash_password(new_password)
     db.session.delete(reset_entry)
     db.session.commit()
 
@@ -1,17 +1,29 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from firebase_admin import storage
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, get_current_user
 from werkzeug.utils import secure_filename
 from models.inspection_results import InspectionResult
 from models.template import Template
 from models.vehicle import Vehicle
 from models.user import User
 from models.inspection_photos import InspectionPhoto
-from extensions import db, socketio
+from models.vehicle_latest_state import VehicleLatestState
+from extensions import db
+from utils.db_routing import use_replica_for_reads
+from sockets.org_events import notify_inspection_created
+from utils.pagination import encode_cursor, keyset_page, parse_limit
+from utils.photo_uploads import enqueue_upload, process_upload, upload_photo_variants
+from utils.storage import get_storage
+from utils import exporters, template_cache
+from utils.idempotency import idempotent
+from sqlalchemy import select, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import lazyload
 from datetime import datetime, timezone
+import tempfile
 import uuid
 
 inspections_bp = Blueprint("inspections", __name__)
+use_replica_for_reads(inspections_bp)
 
 def driver_can_access(user, inspection):
 #    - Driver can always access their own inspections.
@@ -28,9 +40,26 @@ def filter_by_driver_access(query, user):
     return query.filter(InspectionResult.driver_id == user.id)
 
 
+# Helper shared by single and batch submits
+def validate_submission(data):
+    if not data.get('template_id') or not data.get('results') or not data.get('vehicle_id') or not data.get('type'):
+        return "template_id, vehicle_id, type, and results are required"
+    if not isinstance(data.get('results'), dict):
+        return "results must be a JSON object"
+    start_mileage = data.get("start_mileage")
+    if start_mileage is None:
+        return "start_mileage is required for all inspections"
+    if not isinstance(start_mileage, (int, float)):
+        return "start_mileage must be a number"
+    if start_mileage > 1000000:
+        return "start_mileage seems too high"
+    return None
+
+
 # Submit inspection
 @inspections_bp.post('/submit')
 @jwt_required()
+@idempotent
 def submit_inspection():
     data = request.get_json()
     driver_id = int(get_jwt_identity())
@@ -43,38 +72,51 @@ def submit_inspection():
     start_mileage = data.get("start_mileage")
 
     # Basic validations 
-    if not template_id or not results or not vehicle_id or not inspection_type:
-        return jsonify({"error": "template_id, vehicle_id, type, and results are required"}), 400
-    if not isinstance(results, dict):
-        return jsonify({"error": "results must be a JSON object"}), 400
-    if start_mileage is None:
-        return jsonify({"error": "start_mileage is required for all inspections"}), 400
-    if start_mileage > 1000000:
-        return jsonify({"error": "start_mileage seems too high"}), 400
+    error = validate_submission(data)
+    if error:
+        return jsonify({"error": error}), 400
 
     claims = get_jwt()
     if claims.get("role") != "driver":
         return jsonify({"error": "Only drivers can submit inspections"}), 403
 
+    driver = get_current_user()
+    org_id = driver.org_id
+
+    # Template and the draft being submitted are fetched in one round trip
+    if inspection_id:
+        draft_match = InspectionResult.id == inspection_id
+    else:
+        draft_match = and_(
+            InspectionResult.driver_id == driver_id,
+            InspectionResult.vehicle_id == vehicle_id,
+            InspectionResult.template_id == Template.id,
+            InspectionResult.is_draft == True
+        )
+    row = (db.session.query(Template, InspectionResult)
+           .outerjoin(InspectionResult, draft_match)
+           .filter(Template.id == template_id)
+           .options(lazyload(InspectionResult.driver), lazyload(InspectionResult.template))
+           .first())
+
     # Template validation 
-    template = Template.query.get(template_id)
-    if not template:
+    if not row:
         return jsonify({"error": "Template not found"}), 404
-    driver = User.query.get(driver_id)
-    if template.org_id is not None and driver.org_id != template.org_id:
+    template, draft = row
+    if template.org_id is not None and org_id != template.org_id:
         return jsonify({"error": "Template does not belong to your organization"}), 403
+    if inspection_id and not draft:
+        return jsonify({"error": "Draft inspection not found"}), 404
 
-    # Vehicle / mileage validation 
-    vehicle = Vehicle.query.get(vehicle_id)
+    # Vehicle / mileage validation; the row stays locked until commit so
+    # concurrent submits for the same vehicle cannot race on mileage
+    vehicle = Vehicle.query.filter_by(id=vehicle_id).with_for_update().first()
     if vehicle and vehicle.mileage is not None and start_mileage < vehicle.mileage:
         return jsonify({"error": "start_mileage cannot be less than vehicle's current mileage"}), 400
 
     # Create / update inspection
-    if inspection_id:
-        inspection_record = InspectionResult.query.get(inspection_id)
-        if not inspection_record:
-            return jsonify({"error": "Draft inspection not found"}), 404
-        # Update existing draft
+    if draft:
+        inspection_record = draft
         inspection_record.results = results
         inspection_record.notes = notes
         inspection_record.start_mileage = start_mileage
@@ -87,96 +129,394 @@ def submit_inspection():
         inspection_record.driver_last_name = driver.last_name
         inspection_record.driver_full_name = f"{driver.first_name} {driver.last_name}"
     else:
-        # Look for existing draft
-        draft = InspectionResult.query.filter_by(
+        inspection_record = InspectionResult(
             driver_id=driver_id,
             vehicle_id=vehicle_id,
             template_id=template_id,
-            is_draft=True
-        ).first()
-        if draft:
-            draft.results = results
-            draft.notes = notes
-            draft.start_mileage = start_mileage
-            draft.fuel_level = data.get("fuel_level")
-            draft.fuel_notes = data.get("fuel_notes")
-            draft.odometer_verified = data.get("odometer_verified", False)
-            draft.is_draft = False
-            draft.driver_first_name = driver.first_name
-            draft.driver_last_name = driver.last_name
-            draft.driver_full_name = f"{driver.first_name} {driver.last_name}"
-            inspection_record = draft
-        else:
-            inspection_record = InspectionResult(
-                driver_id=driver_id,
-                vehicle_id=vehicle_id,
-                template_id=template_id,
-                type=inspection_type,
-                results=results or {},
-                created_at=datetime.now(timezone.utc),
-                notes=notes,
-                start_mileage=start_mileage,
-                fuel_level=data.get("fuel_level"),
-                fuel_notes=data.get("fuel_notes"),
-                odometer_verified=data.get("odometer_verified", False),
-                org_id=driver.org_id,
-                is_draft=False,
-                driver_first_name=driver.first_name,
-                driver_last_name=driver.last_name,
-                driver_full_name=f"{driver.first_name} {driver.last_name}"
-            )
-            db.session.add(inspection_record)
+            type=inspection_type,
+            results=results or {},
+            created_at=datetime.now(timezone.utc),
+            notes=notes,
+            start_mileage=start_mileage,
+            fuel_level=data.get("fuel_level"),
+            fuel_notes=data.get("fuel_notes"),
+            odometer_verified=data.get("odometer_verified", False),
+            org_id=org_id,
+            is_draft=False,
+            driver_first_name=driver.first_name,
+            driver_last_name=driver.last_name,
+            driver_full_name=f"{driver.first_name} {driver.last_name}"
+        )
+        db.session.add(inspection_record)
 
     # Update vehicle mileage 
     if vehicle:
         vehicle.mileage = start_mileage
+    db.session.flush()
+    VehicleLatestState.record(inspection_record)
 
-    db.session.commit()
-
-    # Cleanup leftover drafts
+    # Cleanup leftover drafts in the same transaction
     db.session.query(InspectionResult).filter(
         InspectionResult.driver_id == driver_id,
         InspectionResult.vehicle_id == vehicle_id,
         InspectionResult.is_draft == True
-    ).delete()
+    ).delete(synchronize_session=False)
+
+    # Serialize once, before commit expires the instance
+    payload = inspection_record.to_dict()
     db.session.commit()
 
     # Socket emit
-    if driver.org_id:
-        socketio.emit(
-            "inspection_created",
-            {
-                "inspection": inspection_record.to_dict()
-            },
-            room=f"org_{driver.org_id}",
-        )
+    if org_id:
+        notify_inspection_created(org_id, payload)
+
+    return jsonify(payload), 201
+
+
+
+# --
+# Submit a batch of inspections queued offline
+# Each item needs a client-generated client_key; replays of an already stored
+# key are reported as duplicates instead of inserted again.
+# --
+MAX_BATCH_SIZE = 100
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+@inspections_bp.post('/submit-batch')
+@jwt_required()
+def submit_inspection_batch():
+    claims = get_jwt()
+    if claims.get("role") != "driver":
+        return jsonify({"error": "Only drivers can submit inspections"}), 403
+
+    data = request.get_json() or {}
+    items = data.get("inspections")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "inspections must be a non-empty list"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} inspections per batch"}), 400
+    if not all(isinstance(item, dict) for item in items):
+        return jsonify({"error": "Each inspection must be a JSON object"}), 400
+
+    driver = get_current_user()
+    driver_id, org_id = driver.id, driver.org_id
+    first_name, last_name = driver.first_name, driver.last_name
+
+    # Bulk validation lookups; vehicles are locked in id order to avoid deadlocks
+    template_ids = {item.get("template_id") for item in items if _is_id(item.get("template_id"))}
+    vehicle_ids = {item.get("vehicle_id") for item in items if _is_id(item.get("vehicle_id"))}
+    templates = {t.id: t for t in Template.query.filter(Template.id.in_(template_ids))}
+    vehicles = {v.id: v for v in Vehicle.query.filter(Vehicle.id.in_(vehicle_ids)).order_by(Vehicle.id).with_for_update()}
+
+    # Keys this driver already stored are replays: report them as duplicates before
+    # validating, since e.g. the vehicle's mileage has since moved past them
+    keys = {item.get("client_key") for item in items if isinstance(item.get("client_key"), str)}
+    stored = dict(db.session.query(InspectionResult.client_key, InspectionResult.id)
+                  .filter(InspectionResult.driver_id == driver_id, InspectionResult.client_key.in_(keys)))
+
+    now = datetime.now(timezone.utc)
+    outcomes, rows, seen_keys = [], [], set()
+    for item in items:
+        client_key = item.get("client_key")
+        if isinstance(client_key, str) and client_key in stored:
+            outcomes.append({"client_key": client_key, "status": "duplicate", "error": None,
+                             "id": stored[client_key]})
+            continue
+        error = validate_submission(item)
+        if not error and not (_is_id(item["template_id"]) and _is_id(item["vehicle_id"])):
+            error = "template_id and vehicle_id must be integers"
+        elif not error and (not isinstance(client_key, str) or not 0 < len(client_key) <= 64):
+            error = "client_key is required (max 64 characters)"
+        elif not error and client_key in seen_keys:
+            error = "Duplicate client_key in batch"
+        template = templates.get(item["template_id"]) if not error else None
+        vehicle = vehicles.get(item["vehicle_id"]) if not error else None
+        if not error and not template:
+            error = "Template not found"
+        elif not error and template.org_id is not None and org_id != template.org_id:
+            error = "Template does not belong to your organization"
+        elif not error and not vehicle:
+            error = "Vehicle not found"
+        elif not error and vehicle.org_id is not None and org_id != vehicle.org_id:
+            error = "Vehicle does not belong to your organization"
+        elif not error and vehicle.mileage is not None and item["start_mileage"] < vehicle.mileage:
+            error = "start_mileage cannot be less than vehicle's current mileage"
+
+        created_at = now
+        if not error and item.get("created_at"):
+            try:
+                created_at = datetime.fromisoformat(item["created_at"])
+            except (TypeError, ValueError):
+                error = "created_at must be an ISO 8601 timestamp"
+            else:
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                created_at = min(created_at, now)
+
+        outcomes.append({"client_key": client_key, "status": "error" if error else None, "error": error})
+        if error:
+            continue
+        seen_keys.add(client_key)
+        rows.append({
+            "driver_id": driver_id,
+            "vehicle_id": item["vehicle_id"],
+            "template_id": item["template_id"],
+            "org_id": org_id,
+            "type": item["type"],
+            "results": item["results"],
+            "status": item.get("status"),
+            "notes": item.get("notes"),
+            "start_mileage": item["start_mileage"],
+            "fuel_level": item.get("fuel_level"),
+            "fuel_notes": item.get("fuel_notes"),
+            "odometer_verified": item.get("odometer_verified", False),
+            "location": item.get("location"),
+            "created_at": created_at,
+            "is_draft": False,
+            "driver_first_name": first_name,
+            "driver_last_name": last_name,
+            "driver_full_name": f"{first_name} {last_name}",
+            "client_key": client_key,
+        })
+
+    # One multi-row INSERT; keys already stored for this driver are skipped
+    created = {}
+    if rows:
+        table = InspectionResult.__table__
+        stmt = (pg_insert(table)
+                .values(rows)
+                .on_conflict_do_nothing(
+                    index_elements=[table.c.driver_id, table.c.client_key],
+                    index_where=table.c.client_key.isnot(None))
+                .returning(table.c.id, table.c.client_key))
+        created = {key: inspection_id for inspection_id, key in db.session.execute(stmt)}
+
+    duplicates = [row["client_key"] for row in rows if row["client_key"] not in created]
+    existing = {}
+    if duplicates:
+        existing = dict(db.session.query(InspectionResult.client_key, InspectionResult.id)
+                        .filter(InspectionResult.driver_id == driver_id,
+                                InspectionResult.client_key.in_(duplicates)))
+    for outcome in outcomes:
+        if outcome["status"] is None:
+            key = outcome["client_key"]
+            outcome["status"] = "created" if key in created else "duplicate"
+            outcome["id"] = created.get(key) or existing.get(key)
+
+    # Advance each vehicle to the highest mileage and record its newest inspection
+    latest = {}
+    for row in rows:
+        if row["client_key"] not in created:
+            continue
+        vehicle = vehicles.get(row["vehicle_id"])
+        if vehicle and (vehicle.mileage is None or row["start_mileage"] > vehicle.mileage):
+            vehicle.mileage = row["start_mileage"]
+        if vehicle and (row["vehicle_id"] not in latest or row["created_at"] >= latest[row["vehicle_id"]]["created_at"]):
+            latest[row["vehicle_id"]] = row
+    VehicleLatestState.upsert([{
+        "vehicle_id": row["vehicle_id"],
+        "inspection_id": created[row["client_key"]],
+        "org_id": row["org_id"],
+        "driver_id": row["driver_id"],
+        "type": row["type"],
+        "status": row["status"],
+        "start_mileage": row["start_mileage"],
+        "fuel_level": row["fuel_level"],
+        "inspected_at": row["created_at"],
+    } for row in latest.values()])
+
+    db.session.commit()
 
+    payloads = []
+    if created:
+        inspections = (InspectionResult.query
+                       .options(*InspectionResult.bulk_load_options())
+                       .filter(InspectionResult.id.in_(created.values()))
+                       .order_by(InspectionResult.created_at, InspectionResult.id)
+                       .all())
+        payloads = InspectionResult.serialize_many(inspections)
+        if org_id:
+            for payload in payloads:
+                notify_inspection_created(org_id, payload)
 
-    return jsonify(inspection_record.to_dict()), 201
+    return jsonify({"results": outcomes, "inspections": payloads}), 200
 
 
 
 # Get inspection history
+# Without paging params the full history is returned as a JSON array (legacy behaviour).
+# ?limit=&cursor= returns one keyset page, ?stream=1 streams every row as NDJSON.
 @inspections_bp.get('/history')
 @jwt_required()
 def get_inspection_history():
-    user_id = get_jwt_identity()
     claims = get_jwt()
     role = claims.get("role")
-    user = User.query.get(user_id)
+    user = get_current_user()
 
     if role == "driver":
         inspections_query = filter_by_driver_access(InspectionResult.query, user)
-        inspections = inspections_query.all()
     elif role == "admin":
         if not user.org_id:
             return jsonify({"error": "Admin has no org"}), 400
-        inspections = InspectionResult.query.filter_by(org_id=user.org_id, is_draft=False).all()
+        inspections_query = InspectionResult.query.filter_by(org_id=user.org_id, is_draft=False)
     else:
         return jsonify({"error": "Unauthorized role"}), 403
+    inspections_query = inspections_query.options(*InspectionResult.bulk_load_options())
 
-    response = [insp.to_dict() for insp in inspections]
-    return jsonify(response), 200
+    cursor = request.args.get("cursor")
+    stream = request.args.get("stream", "").lower() in ("1", "true")
+    if not stream and "limit" not in request.args and not cursor:
+        inspections = inspections_query.all()
+        response = InspectionResult.serialize_many(inspections)
+        return jsonify(response), 200
+
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        inspections_query = keyset_page(
+            inspections_query, InspectionResult.created_at, InspectionResult.id, cursor
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream:
+        return _stream_inspections(inspections_query, batch_size=limit)
+
+    inspections = inspections_query.limit(limit + 1).all()
+    next_cursor = None
+    if len(inspections) > limit:
+        inspections = inspections[:limit]
+        last = inspections[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return jsonify({
+        "inspections": InspectionResult.serialize_many(inspections),
+        "next_cursor": next_cursor
+    }), 200
+
+
+def _stream_inspections(query, batch_size):
+    # Rows are fetched from a server-side cursor in batches so memory stays flat
+    rows = query.execution_options(stream_results=True).yield_per(batch_size)
+
+    def generate():
+        item_names_cache = {}
+        for insp in rows:
+            yield current_app.json.dumps(insp.to_dict(item_names=insp.template_item_names(item_names_cache))) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+
+# --
+# Export inspections (admin only)
+# ?format=csv|ndjson|columnar&start=<iso>&end=<iso> (end is exclusive)
+# --
+@inspections_bp.get('/export')
+@jwt_required()
+def export_inspections():
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Only admins can export inspections"}), 403
+    user = get_current_user()
+    if not user.org_id:
+        return jsonify({"error": "Admin has no org"}), 400
+
+    export_format = request.args.get("format", "csv").lower()
+    if export_format not in exporters.FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(exporters.FORMATS)}"}), 400
+    try:
+        start = datetime.fromisoformat(request.args["start"]) if request.args.get("start") else None
+        end = datetime.fromisoformat(request.args["end"]) if request.args.get("end") else None
+        batch_size = parse_limit(request.args.get("batch_size"), default=1000, maximum=5000)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filters = [InspectionResult.org_id == user.org_id, InspectionResult.is_draft == False]
+    if start:
+        filters.append(InspectionResult.created_at >= start)
+    if end:
+        filters.append(InspectionResult.created_at < end)
+
+    # Item-name columns come from the templates actually used in the range
+    template_versions = (db.session.query(Template.id, Template.version)
+                         .join(InspectionResult, InspectionResult.template_id == Template.id)
+                         .filter(*filters)
+                         .distinct()
+                         .all())
+    names = template_cache.item_names_many(template_versions) if template_versions else {}
+    item_cols, column_for_item = exporters.item_columns(names)
+    columns = exporters.BASE_COLUMNS + item_cols + [exporters.UNMAPPED_COLUMN]
+
+    stmt = (select(*[getattr(InspectionResult, col) for col in exporters.BASE_COLUMNS],
+                   InspectionResult.results)
+            .where(*filters)
+            .order_by(InspectionResult.created_at, InspectionResult.id)
+            .execution_options(stream_results=True, yield_per=batch_size))
+
+    def batches():
+        # Server-side cursor: only one batch of rows is held in memory at a time
+        for partition in db.session.execute(stmt).partitions():
+            yield [exporters.flatten(row._mapping, column_for_item) for row in partition]
+
+    writer, mimetype = exporters.FORMATS[export_format]
+    extension = "csv" if export_format == "csv" else "ndjson"
+    return Response(
+        stream_with_context(writer(batches(), columns)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=inspections-{user.org_id}.{extension}"},
+    )
+
+
+
+# --
+# Fleet stats (admin only)
+# ?start=<iso>&end=<iso>&bucket=day|week|month
+# --
+STATS_BUCKETS = ("day", "week", "month")
+
+
+@inspections_bp.get('/stats')
+@jwt_required()
+def get_inspection_stats():
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Only admins can view stats"}), 403
+    user = get_current_user()
+    if not user.org_id:
+        return jsonify({"error": "Admin has no org"}), 400
+
+    bucket = request.args.get("bucket")
+    if bucket and bucket not in STATS_BUCKETS:
+        return jsonify({"error": f"bucket must be one of {', '.join(STATS_BUCKETS)}"}), 400
+    try:
+        start = datetime.fromisoformat(request.args["start"]) if request.args.get("start") else None
+        end = datetime.fromisoformat(request.args["end"]) if request.args.get("end") else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    vehicles, drivers = InspectionResult.fleet_stats(user.org_id, start, end, bucket)
+
+    def to_json(row, key):
+        return {
+            key: row[key],
+            "bucket": row["bucket"].isoformat() if row["bucket"] else None,
+            "inspections": row["inspections"],
+            "failures": row["failures"],
+            "failure_rate": row["failures"] / row["inspections"] if row["inspections"] else 0,
+            "last_inspection_at": row["last_inspection_at"].isoformat() if row["last_inspection_at"] else None,
+            "miles": row["miles"],
+            "fuel_used": row["fuel_used"],
+        }
+
+    return jsonify({
+        "bucket": bucket,
+        "vehicles": [to_json(row, "vehicle_id") for row in vehicles],
+        "drivers": [to_json(row, "driver_id") for row in drivers],
+    }), 200
 
 
 
@@ -190,7 +530,7 @@ def get_inspection(inspection_id):
     if not inspection:
         return jsonify({"error": "Inspection not found"}), 404
 
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     claims = get_jwt()
     role = claims.get("role")
 
@@ -198,9 +538,8 @@ def get_inspection(inspection_id):
         return jsonify({"error": "Unauthorized"}), 403
 
     response = inspection.to_dict()
-    template = Template.query.get(inspection.template_id)
-    if template:
-        response["template"] = template.to_dict()
+    if inspection.template:
+        response["template"] = template_cache.template_dict(inspection.template)
 
     return jsonify(response), 200
 
@@ -212,15 +551,21 @@ def get_inspection(inspection_id):
 @inspections_bp.get('/last/<int:vehicle_id>')
 @jwt_required()
 def get_last_inspection(vehicle_id):
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     claims = get_jwt()
     role = claims.get("role")
 
-    query = InspectionResult.query.filter_by(vehicle_id=vehicle_id).order_by(InspectionResult.created_at.desc())
-    if role == "driver":
-        query = filter_by_driver_access(query, user)
-
-    last_inspection = query.first()
+    # Served from vehicle_latest_state; fall back to a query when the state's
+    # inspection was deleted (inspection_id is SET NULL) or, for drivers, when
+    # the vehicle's latest inspection belongs to someone else
+    state = db.session.get(VehicleLatestState, vehicle_id)
+    if state and state.inspection and (role != "driver" or state.driver_id == user.id):
+        last_inspection = state.inspection
+    else:
+        query = InspectionResult.query.filter_by(vehicle_id=vehicle_id, is_draft=False).order_by(InspectionResult.created_at.desc())
+        if role == "driver":
+            query = filter_by_driver_access(query, user)
+        last_inspection = query.first()
     if not last_inspection:
         return jsonify({"message": "No inspections found for this vehicle"}), 200
 
@@ -276,6 +621,7 @@ def update_inspection(inspection_id):
     # Update vehicle mileage
     if vehicle:
         vehicle.mileage = start_mileage
+    VehicleLatestState.record(inspection)
 
     db.session.commit()
     return jsonify(inspection.to_dict()), 200
@@ -286,6 +632,7 @@ def update_inspection(inspection_id):
 # --
 @inspections_bp.post('/start')
 @jwt_required()
+@idempotent
 def start_inspection():
     driver_id = int(get_jwt_identity())
     data = request.get_json()
@@ -295,7 +642,7 @@ def start_inspection():
     if not vehicle_id:
         return jsonify({"error": "vehicle_id is required"}), 400
 
-    driver = User.query.get(driver_id)
+    driver = get_current_user()
     org_id = driver.org_id
 
     # Check for existing draft
@@ -316,18 +663,23 @@ def start_inspection():
             "inspection_id": existing_draft.id
         }), 200
 
-    # Determine inspection type based on last inspection
-    last_inspection_query = InspectionResult.query.filter_by(
-        driver_id=driver_id,
-        vehicle_id=vehicle_id,
-        is_draft=False
-    )
-    if org_id:
-        last_inspection_query = last_inspection_query.filter_by(org_id=org_id)
+    # Determine inspection type based on last inspection; the vehicle's latest
+    # state answers this directly when this driver did the last inspection
+    state = db.session.get(VehicleLatestState, vehicle_id)
+    if state and state.inspection_id and state.driver_id == driver_id and (not org_id or state.org_id == org_id):
+        last_inspection = state
+    else:
+        last_inspection_query = InspectionResult.query.filter_by(
+            driver_id=driver_id,
+            vehicle_id=vehicle_id,
+            is_draft=False
+        )
+        if org_id:
+            last_inspection_query = last_inspection_query.filter_by(org_id=org_id)
 
-    last_inspection = last_inspection_query.order_by(
-        InspectionResult.created_at.desc()
-    ).first()
+        last_inspection = last_inspection_query.order_by(
+            InspectionResult.created_at.desc()
+        ).first()
 
     if not last_inspection:
         inspection_type = 'pre'
@@ -363,9 +715,13 @@ def start_inspection():
 
 # --
 # Upload Photo
+# Pass async=1 (form field or query param) to get a 202 with a pending photo id;
+# the file is spooled to disk and uploaded by a background worker, which emits
+# inspection_photo_ready / inspection_photo_failed on the org room when done.
 # --
 @inspections_bp.post('/upload-photo')
 @jwt_required()
+@idempotent
 def upload_inspection_photo():
     driver_id = int(get_jwt_identity())
 
@@ -389,14 +745,15 @@ def upload_inspection_photo():
     if not inspection:
         return jsonify({"error": "Inspection not found"}), 404
 
-    print("DEBUG: Received inspection_id:", inspection_id)
-    print("DEBUG: Received inspection_item_id:", inspection_item_id)
-    print("DEBUG: inspection.template_id:", inspection.template_id)
+    current_app.logger.debug(
+        "upload-photo: inspection_id=%s inspection_item_id=%s template_id=%s",
+        inspection_id, inspection_item_id, inspection.template_id,
+    )
     # Verify item belongs to the same template (if provided)
     if inspection_item_id:
         from models.template_item import TemplateItem 
         item = TemplateItem.query.get(inspection_item_id)
-        print("DEBUG: item.template_id:", getattr(item, 'template_id', None))
+        current_app.logger.debug("upload-photo: item.template_id=%s", getattr(item, 'template_id', None))
         if not item:
             return jsonify({"error": "Invalid inspection_item_id"}), 400
         if item.template_id != inspection.template_id:
@@ -410,28 +767,61 @@ def upload_inspection_photo():
     item_segment = f"items/{inspection_item_id}/" if inspection_item_id else ""
     storage_path = f"orgs/{org_id}/inspections/{inspection.id}/{item_segment}{unique_filename}"
 
-    # Upload to Firebase
-    bucket = storage.bucket()
-    blob = bucket.blob(storage_path)
-    blob.upload_from_file(file, content_type=file.content_type)
-    photo_url = blob.public_url
+    upload_async = (request.form.get('async') or request.args.get('async', '')).lower() in ("1", "true")
+    if upload_async:
+        return _upload_photo_async(file, storage_path, inspection, inspection_item_id, driver_id)
+
+    # Upload to storage
+    photo_url, thumbnails = upload_photo_variants(get_storage(), storage_path, file.stream, file.content_type)
 
     # Save to DB
     new_photo = InspectionPhoto(
         inspection_id=inspection.id,
         inspection_item_id=inspection_item_id,
         driver_id=driver_id,
-        url=photo_url
+        url=photo_url,
+        thumbnails=thumbnails
     )
 
-    print("DEBUG: Uploading file:", file.filename)
-    print("DEBUG: Storage path:", storage_path)
+    current_app.logger.debug("upload-photo: uploaded %s to %s", file.filename, storage_path)
 
     db.session.add(new_photo)
     db.session.commit()
 
     return jsonify({
         "photo_url": photo_url,
+        "thumbnails": thumbnails,
         "inspection_id": inspection.id,
         "inspection_item_id": inspection_item_id
     }), 200
+
+
+def _upload_photo_async(file, storage_path, inspection, inspection_item_id, driver_id):
+    # Spool the body to disk so the request can return before storage is reached
+    spool = tempfile.NamedTemporaryFile(
+        delete=False, dir=current_app.config.get("PHOTO_SPOOL_DIR"), suffix=".upload"
+    )
+    with spool:
+        file.save(spool)
+
+    new_photo = InspectionPhoto(
+        inspection_id=inspection.id,
+        inspection_item_id=inspection_item_id,
+        driver_id=driver_id,
+        status="pending"
+    )
+    db.session.add(new_photo)
+    db.session.commit()
+
+    org_id = inspection.org_id
+    if not enqueue_upload(new_photo.id, spool.name, storage_path, file.content_type, org_id):
+        # Worker queue is full: fall back to uploading within the request
+        process_upload(new_photo.id, spool.name, storage_path, file.content_type, org_id)
+
+    return jsonify({
+        "photo_id": new_photo.id,
+        "status": new_photo.status,
+        "photo_url": new_photo.url,
+        "inspection_id": inspection.id,
+        "inspection_item_id": inspection_item_id
+    }), 202
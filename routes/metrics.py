@@ -0,0 +1,27 @@
+from flask import Blueprint, Response, jsonify, request, current_app
+from extensions import db
+from sockets.dispatcher import dispatcher
+from utils.db_pool import pool_stats
+from utils.instrumentation import render_latest
+
+metrics_bp = Blueprint("metrics", __name__)
+
+@metrics_bp.before_request
+def check_metrics_token():
+    # Open unless METRICS_TOKEN is set, in which case a matching bearer token is required
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return jsonify({"error": "Unauthorized"}), 401
+
+@metrics_bp.get('')
+def prometheus_metrics():
+    body, content_type = render_latest()
+    return Response(body, content_type=content_type)
+
+@metrics_bp.get('/sockets')
+def socket_metrics():
+    return jsonify(dispatcher.stats()), 200
+
+@metrics_bp.get('/db-pool')
+def db_pool_metrics():
+    return jsonify(pool_stats(db.engine)), 200
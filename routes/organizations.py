@@ -1,18 +1,22 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_current_user
 from extensions import db
+from utils.db_routing import use_replica_for_reads
 from models.organization import Organization
 from models.user import User
-from models.vehicle import Vehicle
-from sockets.org_events import notify_driver_joined, notify_driver_left
+from models.org_deletion_job import OrgDeletionJob
+from sockets.org_events import evict_user, notify_driver_joined, notify_driver_left
+from utils.user_cache import invalidate_user
+from utils import org_deletion
 from uuid import uuid4
 
 organizations_bp = Blueprint("organizations", __name__)
+use_replica_for_reads(organizations_bp)
 
 @organizations_bp.get('/code')
 @jwt_required()
 def get_organization_code():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     if not user or user.role != 'admin':
         return jsonify({"error": "Only admins can get the organization invite code"}), 403
 
@@ -25,7 +29,7 @@ def get_organization_code():
 @organizations_bp.get('/me')
 @jwt_required()
 def get_my_organization():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
     if not user.org_id:
@@ -40,7 +44,7 @@ def get_my_organization():
 @organizations_bp.get('/users')
 @jwt_required()
 def get_org_users():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     if not user or user.role != "admin":
         return jsonify({"error": "Only admins can view org users"}), 403
 
@@ -56,7 +60,7 @@ def get_org_users():
 @organizations_bp.post('/code/regenerate')
 @jwt_required()
 def regenerate_org_code():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     if not user or user.role != "admin":
         return jsonify({"error": "Only admins can regenerate codes"}), 403
 
@@ -72,7 +76,7 @@ def regenerate_org_code():
 @organizations_bp.post('/join')
 @jwt_required()
 def join_organization():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     if not user or user.role != 'driver':
         return jsonify({"error": "Only drivers can join an organization"}), 403
 
@@ -87,6 +91,8 @@ def join_organization():
 
     user.org_id = org.id
     db.session.commit()
+    invalidate_user(user.id)
+    evict_user(user.id)
     notify_driver_joined(user.org_id, user)
 
     return jsonify({
@@ -97,7 +103,7 @@ def join_organization():
 @organizations_bp.post("/create")
 @jwt_required()
 def create_organization():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
 
     # Ensure user is not already in an org
     if user.org_id:
@@ -120,6 +126,8 @@ def create_organization():
     if user.role == "driver":
         user.role = "admin"
     db.session.commit()
+    invalidate_user(user.id)
+    evict_user(user.id)
 
 
     return jsonify({
@@ -131,7 +139,7 @@ def create_organization():
 @organizations_bp.delete("/delete")
 @jwt_required()
 def delete_organization():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     if not user or user.role != "admin":
         return jsonify({"error": "Only admins can delete organizations"}), 403
 
@@ -139,43 +147,32 @@ def delete_organization():
     if not org:
         return jsonify({"error": "Organization not found"}), 404
 
-    # Remove vehicles
-    for vehicle in Vehicle.query.filter_by(org_id=org.id).all():
-        if vehicle.created_by_user_id is None:
-            db.session.delete(vehicle)
-        else:
-            vehicle.org_id = None
+    # Members, vehicles, templates and the org are removed in batches by a background
+    # job (utils.org_deletion); inspections are retained. Poll status_url for progress.
+    job = org_deletion.start(org.id, user.id)
 
+    return jsonify({
+        "message": "Organization deletion started, inspections retained",
+        "job": job.to_dict(),
+        "status_url": f"/organizations/delete-jobs/{job.id}",
+    }), 202
 
-    # Remove templates but keep inspections
-    for template in org.templates:
-        # Detach inspections from template
-        for inspection in template.inspection_results:
-            inspection.template_id = None
-        db.session.delete(template)
-
-    # remove invite codes
-    org.invite_code = str(uuid4())[:8] 
-    org.admin_invite_code = None
-
-    # Remove org reference from users
-    users = User.query.filter_by(org_id=org.id).all()
-    for u in users:
-        u.org_id = None
-        if u.role == "admin":
-            u.role = "driver"
-
-    db.session.delete(org)
-    db.session.commit()
 
-    return jsonify({"message": "Organization deleted, inspections retained"}), 200
+@organizations_bp.get("/delete-jobs/<int:job_id>")
+@jwt_required()
+def get_delete_job(job_id):
+    user = get_current_user()
+    job = OrgDeletionJob.query.get(job_id)
+    # The requester is no longer an org admin once the job detaches members
+    if not job or job.requested_by != user.id:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
 
 
 @organizations_bp.put('/<int:org_id>')
 @jwt_required()
 def update_organization(org_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or user.role != 'admin':
         return jsonify({"error": "Unauthorized"}), 403
 
@@ -203,7 +200,7 @@ def update_organization(org_id):
 @organizations_bp.post("/remove_driver")
 @jwt_required()
 def remove_driver():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     if not user or user.role != "admin":
         return jsonify({"error": "Only admins can remove drivers"}), 403
 
@@ -222,6 +219,8 @@ def remove_driver():
 
     driver.org_id = None
     db.session.commit()
+    invalidate_user(driver.id)
+    evict_user(driver.id)
     notify_driver_left(user.org_id, driver)
 
     return jsonify({"message": f"Driver {driver.id} removed from organization"}), 200
@@ -229,7 +228,7 @@ def remove_driver():
 @organizations_bp.post("/leave")
 @jwt_required()
 def leave_organization():
-    user = User.query.get(get_jwt_identity())
+    user = get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
     if not user.org_id:
@@ -242,6 +241,8 @@ def leave_organization():
     org_id = user.org_id
     user.org_id = None
     db.session.commit()
+    invalidate_user(user.id)
+    evict_user(user.id)
     notify_driver_left(org_id, user)
 
     return jsonify({"message": "Successfully left the organization"}), 200
@@ -1,19 +1,20 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt, get_current_user
 from models.template import Template
 from models.template_item import TemplateItem
-from models.user import User
 from extensions import db
-from sqlalchemy import or_, and_
+from utils.db_routing import use_replica_for_reads
+from utils import template_cache
+from sqlalchemy import or_, and_, func
 
 templates_bp = Blueprint("templates", __name__)
+use_replica_for_reads(templates_bp)
 
 # GET templates visible to the user
 @templates_bp.get('/')
 @jwt_required()
 def get_templates():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -27,7 +28,7 @@ def get_templates():
             Template.created_at.desc()
         ).order_by(Template.is_default.desc(), Template.created_at.desc()).all()
 
-    return jsonify([t.to_dict() for t in templates]), 200
+    return jsonify([template_cache.template_dict(t) for t in templates]), 200
 
 
 
@@ -35,8 +36,7 @@ def get_templates():
 @templates_bp.post('/create')
 @jwt_required()
 def create_template():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     claims = get_jwt()
     if claims.get("role") != "admin":
         return jsonify({"error": "Only admins can create templates"}), 403
@@ -61,7 +61,7 @@ def create_template():
 
     new_template = Template(
         name=name,
-        created_by=current_user_id,
+        created_by=user.id,
         org_id=user.org_id,
         is_default=is_default
     )
@@ -83,8 +83,7 @@ def create_template():
 @templates_bp.put('/<int:template_id>/edit')
 @jwt_required()
 def edit_template(template_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     claims = get_jwt()
     if claims.get("role") != "admin":
         return jsonify({"error": "Only admins can edit templates"}), 403
@@ -107,8 +106,13 @@ def edit_template(template_id):
         if existing_default:
             return jsonify({"error": "A default template already exists for your org"}), 400
 
+    old_version = template.version
     template.name = name
     template.is_default = is_default
+    # Incremented in SQL so concurrent edits can't both write the same version;
+    # the UPDATE's row lock also serializes their item replacement below
+    template.version = func.coalesce(Template.version, 1) + 1
+    db.session.flush()
 
     # Clear old items and add new
     TemplateItem.query.filter_by(template_id=template.id).delete()
@@ -123,14 +127,16 @@ def edit_template(template_id):
         db.session.add(new_item)
 
     db.session.commit()
-    return jsonify({"message": "Template updated successfully", "template": template.to_dict()}), 200
+    # Drop the new version's key too, in case a stale entry was cached under it
+    template_cache.invalidate(template.id, old_version)
+    template_cache.invalidate(template.id, template.version)
+    return jsonify({"message": "Template updated successfully", "template": template_cache.template_dict(template)}), 200
 
 # DELETE a template (admin only)
 @templates_bp.delete('/<int:template_id>/delete')
 @jwt_required()
 def delete_template(template_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     claims = get_jwt()
     if claims.get("role") != "admin":
         return jsonify({"error": "Only admins can delete templates"}), 403
@@ -143,7 +149,9 @@ def delete_template(template_id):
         return jsonify({"error": "Default templates cannot be deleted"}), 400
 
     # Delete related items first
+    template_key = (template.id, template.version)
     TemplateItem.query.filter_by(template_id=template.id).delete()
     db.session.delete(template)
     db.session.commit()
+    template_cache.invalidate(*template_key)
     return jsonify({"message": "Template deleted successfully"}), 200
@@ -1,9 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from extensions import db
 from models import User
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_current_user
 import re
 from sockets.user_events import notify_user_updated
+from sockets.org_events import evict_user
+from utils.user_cache import invalidate_user
 
 users_bp = Blueprint("users", __name__)
 
@@ -20,8 +22,7 @@ PHONE_REGEX = r"^\+?\d{7,15}$"
 @users_bp.put("/update")
 @jwt_required()
 def update_user():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -65,6 +66,7 @@ def update_user():
     user.updated_at = db.func.now()
 
     db.session.commit()
+    invalidate_user(user.id)
     notify_user_updated(user.org_id, user)
 
     return jsonify({"message": "User updated successfully", "user": user.to_dict()})
@@ -74,18 +76,16 @@ def update_user():
 def delete_user():
     from models import InspectionResult, Vehicle
 
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
     org_id = user.org_id
 
-    print(f"Deleting user {user.id}, org_id={org_id}")
+    current_app.logger.info(f"Deleting user {user.id}, org_id={org_id}")
 
     if org_id is None:
         # Solo driver → delete inspections and vehicles they created
-        print("Solo driver branch")
         InspectionResult.query.filter_by(driver_id=user.id, org_id=None).delete(synchronize_session=False)
         InspectionResult.query.filter_by(driver_id=user.id).update(
             {"driver_id": None}, synchronize_session=False
@@ -93,7 +93,6 @@ def delete_user():
         Vehicle.query.filter_by(created_by_user_id=user.id).delete(synchronize_session=False)
     else:
         # Affiliated → keep inspections, reassign to org; vehicles remain but null out created_by_user_id
-        print("Affiliated branch")
         InspectionResult.query.filter_by(driver_id=user.id).update(
             {"driver_id": None, "org_id": org_id}, synchronize_session=False
         )
@@ -102,7 +101,10 @@ def delete_user():
         )
 
     # Delete the user itself
+    user_id = user.id
     db.session.delete(user)
     db.session.commit()
+    invalidate_user(user_id)
+    evict_user(user_id)
 
     return jsonify({"message": "User deleted successfully"}), 200
@@ -1,10 +1,12 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt, get_current_user
 from extensions import db
+from utils.db_routing import use_replica_for_reads
 from models.vehicle import Vehicle
-from models.user import User
+from utils.idempotency import idempotent
 
 vehicles_bp = Blueprint("vehicles", __name__)
+use_replica_for_reads(vehicles_bp)
 
 # -----------------------------
 # GET all vehicles that user can see
@@ -12,8 +14,7 @@ vehicles_bp = Blueprint("vehicles", __name__)
 @vehicles_bp.get('/')
 @jwt_required()
 def get_vehicles():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     claims = get_jwt()
     role = claims.get("role")
 
@@ -45,12 +46,12 @@ def get_vehicles():
 # -----------------------------
 @vehicles_bp.post('/add')
 @jwt_required()
+@idempotent
 def add_vehicle():
     data = request.get_json()
-    user_id = get_jwt_identity()
     claims = get_jwt()
     role = claims.get("role")
-    user = User.query.get(user_id)
+    user = get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -80,7 +81,7 @@ def add_vehicle():
         license_plate=license_plate,
         mileage=data.get("mileage"),
         status=data.get("status", "active"),
-        created_by_user_id=user_id,
+        created_by_user_id=user.id,
     )
 
     db.session.add(new_vehicle)
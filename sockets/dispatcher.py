@@ -0,0 +1,66 @@
+import threading
+from extensions import socketio
+from utils.instrumentation import SOCKET_EMITS
+
+
+class OrgEventDispatcher:
+    """Coalesces socket events per room over a short window.
+
+    Events published to a room within `window` seconds go out together: one emit
+    per event name carrying {"items": [...], "count": n}. Items published with the
+    same key in the same window (e.g. two updates to one user) are merged so only
+    the latest fields are sent.
+    """
+
+    def __init__(self, window=0.25):
+        self.window = window
+        self._pending = {}  # room -> {event: {key: payload}}
+        self._lock = threading.Lock()
+        self._published = 0
+        self._coalesced = 0
+        self._emitted = 0
+
+    def init_app(self, app):
+        self.window = app.config.get("SOCKET_COALESCE_WINDOW_MS", 250) / 1000
+
+    def publish(self, room, event, payload, key=None):
+        with self._lock:
+            self._published += 1
+            schedule = room not in self._pending
+            items = self._pending.setdefault(room, {}).setdefault(event, {})
+            if key is None:
+                key = object()
+            if key in items:
+                items[key].update(payload)
+                self._coalesced += 1
+            else:
+                items[key] = dict(payload)
+        if schedule:
+            socketio.start_background_task(self._flush_later, room)
+
+    def _flush_later(self, room):
+        socketio.sleep(self.window)
+        self.flush(room)
+
+    def flush(self, room):
+        with self._lock:
+            events = self._pending.pop(room, {})
+            self._emitted += len(events)
+        for event, items in events.items():
+            payload = list(items.values())
+            socketio.emit(event, {"items": payload, "count": len(payload)}, room=room)
+            SOCKET_EMITS.labels(event).inc()
+
+    def stats(self):
+        with self._lock:
+            queued = sum(len(items) for events in self._pending.values() for items in events.values())
+            return {
+                "rooms_pending": len(self._pending),
+                "queued_events": queued,
+                "published_total": self._published,
+                "coalesced_total": self._coalesced,
+                "emitted_total": self._emitted,
+            }
+
+
+dispatcher = OrgEventDispatcher()
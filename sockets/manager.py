@@ -0,0 +1,87 @@
+import queue
+import threading
+import socketio
+from engineio import json
+
+# Closing one of these rooms disconnects its sockets (see EvictingManagerMixin)
+USER_ROOM_PREFIX = "user_"
+
+
+class EvictingManagerMixin:
+    """close_room() on a user_<id> room disconnects the sockets in it.
+
+    Room listings are per process, but close_room is published over the
+    message queue and replayed by every node through basic_close_room, so each
+    node disconnects the sockets it holds for that user.
+    """
+
+    def basic_close_room(self, room, namespace):
+        if isinstance(room, str) and room.startswith(USER_ROOM_PREFIX):
+            for sid, _ in list(self.get_participants(namespace, room)):
+                # Already on its way to every node; don't publish a second time
+                self.server.disconnect(sid, namespace=namespace, ignore_queue=True)
+        super().basic_close_room(room, namespace)
+
+
+class Manager(EvictingManagerMixin, socketio.Manager):
+    """Single-process manager, used when no message queue is configured."""
+
+
+class LocalPubSubManager(EvictingManagerMixin, socketio.PubSubManager):
+    """In-process stand-in for a message queue.
+
+    Every manager created in the process with the same channel receives every
+    message, so tests can run several SocketIO servers side by side and check
+    that emits fan out between them without Redis. Messages are encoded with
+    the same json module the Redis and Kombu managers use, so payloads they
+    could not publish fail here too.
+    """
+    name = "local"
+    _subscribers = {}
+    _subscribers_lock = threading.Lock()
+
+    def __init__(self, url="local://", channel="flask-socketio", write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self._inbox = queue.Queue()
+        if not write_only:
+            with self._subscribers_lock:
+                self._subscribers.setdefault(channel, []).append(self._inbox)
+
+    def _publish(self, data):
+        message = json.dumps(data)
+        with self._subscribers_lock:
+            inboxes = list(self._subscribers.get(self.channel, []))
+        for inbox in inboxes:
+            inbox.put(message)
+
+    def _listen(self):
+        # PubSubManager._thread decodes the JSON strings
+        while True:
+            yield self._inbox.get()
+
+
+def _queue_manager_class(url):
+    # Same scheme mapping Flask-SocketIO uses for message_queue
+    if url.startswith("local://"):
+        return LocalPubSubManager
+    if url.startswith(("redis://", "rediss://")):
+        base = socketio.RedisManager
+    elif url.startswith("kafka://"):
+        base = socketio.KafkaManager
+    elif url.startswith("zmq"):
+        base = socketio.ZmqManager
+    else:
+        base = socketio.KombuManager
+    return type(f"Evicting{base.__name__}", (EvictingManagerMixin, base), {})
+
+
+def socketio_options(url, channel="flask-socketio"):
+    """Keyword arguments for socketio.init_app() for a SOCKETIO_MESSAGE_QUEUE url.
+
+    The client manager is always built here so it evicts on close_room:
+    local:// uses LocalPubSubManager, redis://, amqp://, kafka:// and zmq+tcp://
+    the matching python-socketio manager, and no url a single-process Manager.
+    """
+    if not url:
+        return {"client_manager": Manager()}
+    return {"client_manager": _queue_manager_class(url)(url, channel=channel)}
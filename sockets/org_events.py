@@ -1,41 +1,133 @@
-import eventlet
-from flask_socketio import join_room, emit
+from datetime import datetime
+from flask import request, session
+from flask_jwt_extended import decode_token
+from flask_socketio import ConnectionRefusedError, join_room, leave_room
+from sqlalchemy.orm import load_only
 from extensions import socketio
+from models.user import User
+from sockets.dispatcher import dispatcher
+from sockets.manager import USER_ROOM_PREFIX
+from utils.json_provider import utc_isoformat
+
+def org_room(org_id):
+    return f"org_{org_id}"
+
+def role_room(org_id, role):
+    # org_{id}_admins / org_{id}_drivers
+    return f"org_{org_id}_{role}s"
+
+def user_room(user_id):
+    # Every socket of a user, so they can be found again when membership changes
+    return f"{USER_ROOM_PREFIX}{user_id}"
+
+def _load_member(user_id):
+    user = User.query.options(load_only(User.id, User.org_id, User.role)).filter_by(id=user_id).first()
+    if user is None:
+        return None
+    return {"user_id": user.id, "org_id": user.org_id, "role": user.role}
+
+def _join_org_rooms(member):
+    join_room(org_room(member["org_id"]))
+    join_room(role_room(member["org_id"], member["role"]))
+
+@socketio.on("connect")
+def handle_connect(auth=None):
+    """Clients pass the access token as auth={"token": ...} (or ?token=...)."""
+    token = (auth or {}).get("token") or request.args.get("token")
+    if not token:
+        raise ConnectionRefusedError("Missing token")
+    try:
+        claims = decode_token(token)
+        user_id = int(claims["sub"])
+    except Exception:
+        raise ConnectionRefusedError("Invalid token")
+    if claims.get("type") != "access":
+        raise ConnectionRefusedError("Access token required")
+
+    member = _load_member(user_id)
+    if member is None:
+        raise ConnectionRefusedError("User not found")
+    # Socket sessions are per connection, so this is resolved once and reused by join_org
+    session.update(member)
+    join_room(user_room(user_id))
+    if member["org_id"]:
+        _join_org_rooms(member)
 
 @socketio.on("join_org")
 def handle_join_org(data):
-    org_id = data.get("org_id")
-    join_room(f"org_{org_id}")
-    print(f"[SocketIO] Client joined org {org_id} on / namespace")
+    org_id = (data or {}).get("org_id")
+    if org_id is None:
+        return {"error": "org_id is required"}
+    if str(org_id) != str(session.get("org_id")):
+        # Membership may have changed since connect (joined or left an org)
+        member = _load_member(session["user_id"])
+        if member is None or str(member["org_id"]) != str(org_id):
+            return {"error": "Not a member of this organization"}
+        if session.get("org_id"):
+            leave_room(org_room(session["org_id"]))
+            leave_room(role_room(session["org_id"], session["role"]))
+        session.update(member)
+    _join_org_rooms(session)
+    return {"ok": True}
+
+def evict_user(*user_ids):
+    """Disconnect a user's sockets after their org membership or role changed.
+
+    This drops them from org_<id> and the role rooms at once and discards the
+    socket session join_org trusts; the client reconnects and handle_connect
+    joins the rooms for its current membership. close_room goes over the
+    message queue, so every node disconnects the sockets it holds.
+    """
+    for user_id in user_ids:
+        socketio.close_room(user_room(user_id), namespace="/")
+
+def _driver_payload(driver):
+    return {
+        "id": driver.id,
+        "email": driver.email,
+        "first_name": driver.first_name,
+        "last_name": driver.last_name,
+        "phone_number": driver.phone_number,
+        "role": driver.role,
+        "org_id": driver.org_id,
+        "created_at": driver.created_at.isoformat(),
+        "updated_at": driver.updated_at.isoformat()
+    }
 
 def notify_driver_joined(org_id, driver_data):
-    def _emit():
-        payload = {
-            "id": driver_data.id,
-            "email": driver_data.email,
-            "first_name": driver_data.first_name,
-            "last_name": driver_data.last_name,
-            "phone_number": driver_data.phone_number,
-            "role": driver_data.role,
-            "org_id": driver_data.org_id,
-            "created_at": driver_data.created_at.isoformat(),
-            "updated_at": driver_data.updated_at.isoformat()
-        }
-        socketio.emit("driver_joined", payload, room=f"org_{org_id}")
-    eventlet.spawn(_emit)
+    dispatcher.publish(org_room(org_id), "driver_joined", _driver_payload(driver_data), key=driver_data.id)
 
 def notify_driver_left(org_id, driver):
-    def _emit():
-        payload = {
-            "id": driver.id,
-            "email": driver.email,
-            "first_name": driver.first_name,
-            "last_name": driver.last_name,
-            "phone_number": driver.phone_number,
-            "role": driver.role,
-            "org_id": driver.org_id,
-            "created_at": driver.created_at.isoformat(),
-            "updated_at": driver.updated_at.isoformat()
-        }
-        socketio.emit("driver_left", payload, room=f"org_{org_id}")
-    eventlet.spawn(_emit)
+    dispatcher.publish(org_room(org_id), "driver_left", _driver_payload(driver), key=driver.id)
+
+# Compact delta sent instead of the full inspection; clients GET fetch_url for
+# results, photos and notes when they need them
+INSPECTION_DELTA_FIELDS = (
+    "id", "vehicle_id", "driver_id", "template_id", "org_id", "type", "status",
+    "start_mileage", "fuel_level", "created_at", "completed_at", "driver_full_name",
+)
+
+def notify_inspection_created(org_id, inspection):
+    """inspection is a serialized InspectionResult (to_dict output)."""
+    delta = {field: inspection.get(field) for field in INSPECTION_DELTA_FIELDS}
+    # The Redis/Kombu pub/sub managers publish with the stdlib json module,
+    # so timestamps must already be strings when the delta leaves this process
+    for field in ("created_at", "completed_at"):
+        if isinstance(delta[field], datetime):
+            delta[field] = utc_isoformat(delta[field])
+    delta["fetch_url"] = f"/inspections/{inspection['id']}"
+    # Only admin dashboards consume this; drivers' devices don't receive it
+    dispatcher.publish(role_room(org_id, "admin"), "inspection_created", delta, key=inspection["id"])
+
+def notify_photo_processed(org_id, photo):
+    """photo is a serialized InspectionPhoto; status is "ready" or "failed"."""
+    event = "inspection_photo_ready" if photo["status"] == "ready" else "inspection_photo_failed"
+    delta = {
+        "id": photo["id"],
+        "inspection_id": photo["inspection_id"],
+        "inspection_item_id": photo["inspection_item_id"],
+        "status": photo["status"],
+        "url": photo["url"],
+        "thumbnails": photo["thumbnails"],
+    }
+    dispatcher.publish(org_room(org_id), event, delta, key=photo["id"])
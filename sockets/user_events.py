@@ -1,5 +1,5 @@
-from flask_socketio import emit
-from extensions import socketio
+from sockets.dispatcher import dispatcher
+from sockets.org_events import org_room
 
 def notify_user_updated(org_id, user):
     user_data = {
@@ -14,4 +14,4 @@ def notify_user_updated(org_id, user):
         "updated_at": user.updated_at.isoformat(),
     }
 
-    socketio.emit("user_updated", user_data, room=f"org_{org_id}")
+    dispatcher.publish(org_room(org_id), "user_updated", user_data, key=user.id)
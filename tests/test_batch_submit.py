@@ -0,0 +1,56 @@
+from models import Organization, Vehicle
+
+
+def _item(fleet, client_key, start_mileage):
+    return {
+        "client_key": client_key,
+        "template_id": fleet["template"].id,
+        "vehicle_id": fleet["vehicle"].id,
+        "type": "pre-trip",
+        "results": {str(item.id): "pass" for item in fleet["items"]},
+        "start_mileage": start_mileage,
+    }
+
+
+def test_replayed_batch_reports_duplicates_after_mileage_moved_on(session, fleet, client, auth_headers):
+    headers = auth_headers(fleet["driver"])
+    batch = {"inspections": [_item(fleet, "offline-1", 1100)]}
+
+    first = client.post("/inspections/submit-batch", headers=headers, json=batch).get_json()
+    client.post("/inspections/submit-batch", headers=headers,
+                json={"inspections": [_item(fleet, "offline-2", 1500)]})
+    replay = client.post("/inspections/submit-batch", headers=headers, json=batch).get_json()
+
+    assert first["results"][0]["status"] == "created"
+    assert replay["results"] == [{"client_key": "offline-1", "status": "duplicate", "error": None,
+                                  "id": first["results"][0]["id"]}]
+    assert replay["inspections"] == []
+
+
+def test_bad_items_are_reported_without_failing_the_batch(session, fleet, client, auth_headers):
+    other_org = Organization(name="Other Fleet")
+    session.add(other_org)
+    session.flush()
+    foreign = Vehicle(org_id=other_org.id, license_plate="OTHER1", status="active", mileage=0)
+    session.add(foreign)
+    session.commit()
+    items = [
+        _item(fleet, "ok", 1100),
+        {**_item(fleet, "missing-vehicle", 1100), "vehicle_id": 999999},
+        {**_item(fleet, "foreign-vehicle", 1100), "vehicle_id": foreign.id},
+        {**_item(fleet, "list-id", 1100), "vehicle_id": [1]},
+        {**_item(fleet, "dict-id", 1100), "template_id": {"id": 1}},
+    ]
+
+    response = client.post("/inspections/submit-batch", headers=auth_headers(fleet["driver"]),
+                           json={"inspections": items})
+
+    assert response.status_code == 200
+    outcomes = {o["client_key"]: (o["status"], o["error"]) for o in response.get_json()["results"]}
+    assert outcomes == {
+        "ok": ("created", None),
+        "missing-vehicle": ("error", "Vehicle not found"),
+        "foreign-vehicle": ("error", "Vehicle does not belong to your organization"),
+        "list-id": ("error", "template_id and vehicle_id must be integers"),
+        "dict-id": ("error", "template_id and vehicle_id must be integers"),
+    }
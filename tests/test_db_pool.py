@@ -0,0 +1,31 @@
+import os
+from flask_migrate import upgrade
+from sqlalchemy import text
+from conftest import ROOT, QueryCounter, requires_db
+from app import create_app
+from extensions import db
+from utils.db_pool import engine_options_from_env
+
+
+def test_statement_timeout_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("DB_POOLER_MODE", raising=False)
+    monkeypatch.delenv("DB_STATEMENT_TIMEOUT_MS", raising=False)
+
+    assert "connect_args" not in engine_options_from_env()
+
+
+@requires_db
+def test_migrations_run_without_the_statement_timeout(app, monkeypatch):
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "1234")
+    application = create_app()
+
+    with application.app_context():
+        with QueryCounter(db.engine) as queries:
+            upgrade(directory=os.path.join(ROOT, "migrations"))
+        timeout = db.session.execute(text("SHOW statement_timeout")).scalar()
+        db.session.remove()
+        db.engine.dispose()
+
+    assert "SET statement_timeout = 0" in queries.statements
+    # The pooled connection gets the request timeout back afterwards
+    assert timeout == "1234ms"
@@ -0,0 +1,44 @@
+import eventlet
+import pytest
+from sqlalchemy import event
+from conftest import TEST_DATABASE_URL
+from app import create_app
+from extensions import db
+from utils import db_routing
+
+
+@pytest.fixture
+def replica_app(app, monkeypatch):
+    # The "replica" is the test database itself; only the routing is under test
+    monkeypatch.setenv("REPLICA_DATABASE_URL", TEST_DATABASE_URL or "sqlite://")
+    application = create_app()
+    application.config.update(TESTING=True)
+    return application
+
+
+def _replica_queries(replica_app, client, headers):
+    with replica_app.app_context():
+        replica = db.engines[db_routing.REPLICA_BIND]
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(replica, "before_cursor_execute", record)
+    try:
+        # A lock taken twice would hang the worker; fail instead
+        with eventlet.Timeout(10):
+            response = client.get("/vehicles/", headers=headers)
+    finally:
+        event.remove(replica, "before_cursor_execute", record)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_reads_go_to_replica_until_the_user_writes(replica_app, session, fleet, auth_headers):
+    client = replica_app.test_client()
+    headers = auth_headers(fleet["driver"])
+
+    assert _replica_queries(replica_app, client, headers) > 0
+
+    started = client.post("/inspections/start", headers=headers,
+                          json={"vehicle_id": fleet["vehicle"].id, "template_id": fleet["template"].id})
+    assert started.status_code == 201
+    assert _replica_queries(replica_app, client, headers) == 0
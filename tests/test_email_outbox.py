@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+import click
+import pytest
+from sqlalchemy import text
+from extensions import db
+from models.email_outbox import EmailOutbox
+from utils import email_outbox
+
+
+class RecordingTransport:
+    """Sends nothing; checks from another connection that the row isn't locked."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    def send(self, to_email, subject, html_content):
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT id FROM inspection_app.email_outbox WHERE to_email = :to FOR UPDATE NOWAIT"),
+                         {"to": to_email})
+            conn.rollback()
+        if self.fail:
+            raise RuntimeError("provider down")
+        self.sent.append(to_email)
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    transport = RecordingTransport()
+    monkeypatch.setattr(email_outbox, "get_transport", lambda: transport)
+    return transport
+
+
+def _queue(session, to_email, **fields):
+    message = EmailOutbox(kind="password_reset", to_email=to_email, subject="Reset", html_content="<p>hi</p>",
+                          **fields)
+    session.add(message)
+    session.commit()
+    return message.id
+
+
+def test_dispatch_sends_without_holding_row_locks(session, transport):
+    message_id = _queue(session, "a@example.com")
+
+    assert email_outbox.dispatch_batch() == 1
+
+    assert transport.sent == ["a@example.com"]
+    message = db.session.get(EmailOutbox, message_id)
+    assert message.status == "sent"
+    assert message.sent_at is not None
+
+
+def test_failed_send_is_rescheduled(session, transport):
+    transport.fail = True
+    message_id = _queue(session, "b@example.com")
+
+    email_outbox.dispatch_batch()
+
+    message = db.session.get(EmailOutbox, message_id)
+    assert message.status == "pending"
+    assert message.attempts == 1
+    assert message.next_attempt_at > datetime.utcnow()
+
+
+def test_lapsed_claim_is_sent_again_but_live_claim_is_not(session, transport):
+    now = datetime.utcnow()
+    _queue(session, "lapsed@example.com", status="sending", next_attempt_at=now - timedelta(seconds=1))
+    _queue(session, "live@example.com", status="sending", next_attempt_at=now + timedelta(minutes=5))
+
+    email_outbox.drain()
+
+    assert transport.sent == ["lapsed@example.com"]
+
+
+def test_dispatcher_starts_with_app_but_not_for_cli_commands(app, monkeypatch):
+    started = []
+    monkeypatch.setattr(email_outbox, "_start", started.append)
+    monkeypatch.setitem(app.config, "EMAIL_OUTBOX_DISPATCHER", True)
+
+    with click.Context(click.Command("db")):
+        email_outbox.init_app(app)
+    email_outbox.init_app(app)
+
+    assert started == [app]
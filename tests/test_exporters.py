@@ -0,0 +1,32 @@
+from utils import exporters
+
+
+def _row(**fields):
+    row = dict.fromkeys(exporters.BASE_COLUMNS)
+    row.update(fields)
+    return row
+
+
+def test_item_named_like_a_base_column_gets_its_own_column():
+    columns, column_for_item = exporters.item_columns({1: {10: "status", 11: "Tires"}, 2: {20: "Tires"}})
+
+    assert columns == ["item:status", "item:Tires"]
+    assert column_for_item == {10: "item:status", 11: "item:Tires", 20: "item:Tires"}
+
+    record = exporters.flatten(_row(id=1, status="fail", results={"10": "ok", "11": "worn", "99": "x"}),
+                               column_for_item)
+    assert record["status"] == "fail"
+    assert record["item:status"] == "ok"
+    assert record["item:Tires"] == "worn"
+    assert record[exporters.UNMAPPED_COLUMN] == '{"99": "x"}'
+
+
+def test_items_sharing_a_name_within_a_template_get_separate_columns():
+    columns, column_for_item = exporters.item_columns({1: {10: "Tires", 11: "Tires", 12: "Lights"}, 2: {20: "Tires"}})
+
+    assert columns == ["item:Tires#10", "item:Tires#11", "item:Lights", "item:Tires"]
+    assert column_for_item == {10: "item:Tires#10", 11: "item:Tires#11", 12: "item:Lights", 20: "item:Tires"}
+
+    record = exporters.flatten(_row(id=1, results={"10": "worn", "11": "ok"}), column_for_item)
+    assert record["item:Tires#10"] == "worn"
+    assert record["item:Tires#11"] == "ok"
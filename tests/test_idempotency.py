@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from models import Organization
+from models.idempotency_key import IdempotencyKey
+from utils import idempotency
+
+
+def _start(client, fleet, headers, key):
+    return client.post("/inspections/start", headers={**headers, "Idempotency-Key": key},
+                       json={"vehicle_id": fleet["vehicle"].id, "template_id": fleet["template"].id})
+
+
+def _in_flight(session, fleet, key, locked_at):
+    session.add(IdempotencyKey(user_id=fleet["driver"].id, key=key, endpoint="inspections.start_inspection",
+                               expires_at=datetime.utcnow() + timedelta(hours=1), locked_at=locked_at))
+    session.commit()
+
+
+def test_retry_replays_stored_response(session, fleet, client, auth_headers):
+    headers = auth_headers(fleet["driver"])
+
+    first = _start(client, fleet, headers, "start-1")
+    retry = _start(client, fleet, headers, "start-1")
+
+    assert first.status_code == 201
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.get_json() == first.get_json()
+
+
+def test_retry_waits_while_lease_is_fresh(session, fleet, client, auth_headers):
+    _in_flight(session, fleet, "start-2", datetime.utcnow())
+
+    response = _start(client, fleet, auth_headers(fleet["driver"]), "start-2")
+
+    assert response.status_code == 409
+
+
+def test_retry_reclaims_stale_in_flight_key(session, fleet, client, auth_headers):
+    _in_flight(session, fleet, "start-3", datetime.utcnow() - timedelta(minutes=10))
+
+    response = _start(client, fleet, auth_headers(fleet["driver"]), "start-3")
+
+    assert response.status_code == 201
+    record = IdempotencyKey.query.filter_by(key="start-3").populate_existing().one()
+    assert record.status_code == 201
+    assert record.locked_at is None
+
+
+def test_claim_leaves_request_session_uncommitted(session, fleet):
+    session.add(Organization(name="Uncommitted"))
+    session.flush()
+
+    assert idempotency._claim(fleet["driver"].id, "claim-1", "inspections.start_inspection")
+    session.rollback()
+
+    assert Organization.query.filter_by(name="Uncommitted").count() == 0
+    assert IdempotencyKey.query.filter_by(key="claim-1").count() == 1
+
+
+def test_lost_claim_whose_row_vanished_claims_again(session, fleet, client, auth_headers, monkeypatch):
+    real_claim = idempotency._claim
+    attempts = []
+
+    def claim(*args):
+        # First attempt loses to a row that is released before we can read it
+        attempts.append(args)
+        return None if len(attempts) == 1 else real_claim(*args)
+    monkeypatch.setattr(idempotency, "_claim", claim)
+
+    response = _start(client, fleet, auth_headers(fleet["driver"]), "start-4")
+
+    assert response.status_code == 201
+    assert len(attempts) == 2
@@ -0,0 +1,39 @@
+import io
+from PIL import Image
+from utils.images import downscale
+
+
+def _image_bytes(mode, fmt, size=(400, 300), color="red"):
+    buf = io.BytesIO()
+    Image.new(mode, size, color).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def test_jpeg_is_downscaled_to_jpeg():
+    main, thumbnails, fmt = downscale(io.BytesIO(_image_bytes("RGB", "JPEG")), 200, [50])
+
+    assert fmt == "JPEG"
+    assert Image.open(main).size == (200, 150)
+    assert Image.open(thumbnails[50]).size == (50, 38)
+
+
+def test_transparent_png_keeps_alpha():
+    main, thumbnails, fmt = downscale(io.BytesIO(_image_bytes("RGBA", "PNG", color=(255, 0, 0, 0))), 200, [50])
+
+    assert fmt == "PNG"
+    decoded = Image.open(main)
+    assert decoded.mode == "RGBA"
+    assert decoded.getpixel((0, 0))[3] == 0
+    assert Image.open(thumbnails[50]).format == "PNG"
+
+
+def test_truncated_image_falls_back():
+    data = _image_bytes("RGB", "PNG")
+
+    assert downscale(io.BytesIO(data[:len(data) // 2]), 200, [50]) is None
+
+
+def test_decompression_bomb_falls_back(monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+
+    assert downscale(io.BytesIO(_image_bytes("RGB", "PNG")), 200, [50]) is None
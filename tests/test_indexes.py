@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import text
+
+# (expected index, query shaped like the endpoint that relies on it)
+ACCESS_PATTERNS = [
+    ("ix_inspection_results_org_id_is_draft_created_at",
+     "SELECT id FROM inspection_app.inspection_results WHERE org_id = 1 AND is_draft = false "
+     "ORDER BY created_at DESC, id DESC LIMIT 50"),
+    ("ix_inspection_results_driver_id_vehicle_id_is_draft",
+     "SELECT id FROM inspection_app.inspection_results WHERE driver_id = 1 AND vehicle_id = 1 "
+     "AND is_draft = false ORDER BY created_at DESC LIMIT 1"),
+    ("ix_inspection_results_vehicle_id_created_at",
+     "SELECT id FROM inspection_app.inspection_results WHERE vehicle_id = 1 ORDER BY created_at DESC LIMIT 1"),
+    ("ix_inspection_results_drafts",
+     "SELECT id FROM inspection_app.inspection_results WHERE driver_id = 1 AND vehicle_id = 1 "
+     "AND template_id = 1 AND is_draft"),
+    ("ix_inspection_results_template_id",
+     "SELECT id FROM inspection_app.inspection_results WHERE template_id = 1"),
+    ("ix_user_org_id", 'SELECT id FROM inspection_app."user" WHERE org_id = 1'),
+    ("ix_vehicles_org_id", "SELECT id FROM inspection_app.vehicles WHERE org_id = 1"),
+    ("ix_templates_org_id", "SELECT id FROM inspection_app.templates WHERE org_id = 1"),
+    ("ix_template_items_template_id", "SELECT id FROM inspection_app.template_items WHERE template_id = 1"),
+    ("ix_inspection_photos_inspection_id", "SELECT id FROM inspection_app.inspection_photos WHERE inspection_id = 1"),
+    ("ix_inspection_photos_inspection_item_id",
+     "SELECT id FROM inspection_app.inspection_photos WHERE inspection_item_id = 1"),
+]
+
+
+@pytest.fixture
+def populated(session, fleet):
+    """A few thousand inspections spread over drivers, vehicles and templates, analyzed.
+
+    On empty tables every index costs the same and the planner picks arbitrarily,
+    so give it realistic statistics to choose from.
+    """
+    org_id = fleet["org"].id
+    session.execute(text(
+        "INSERT INTO inspection_app.\"user\" (email, password_hash, role, first_name, last_name, org_id) "
+        "SELECT 'd' || g || '@example.com', 'x', 'driver', 'D', 'D', :org FROM generate_series(1, 50) g"), {"org": org_id})
+    session.execute(text(
+        "INSERT INTO inspection_app.vehicles (org_id, license_plate, status) "
+        "SELECT :org, 'V' || g, 'active' FROM generate_series(1, 50) g"), {"org": org_id})
+    session.execute(text(
+        "INSERT INTO inspection_app.templates (name, org_id, version) "
+        "SELECT 'T' || g, :org, 1 FROM generate_series(1, 20) g"), {"org": org_id})
+    session.execute(text(
+        "INSERT INTO inspection_app.inspection_results "
+        "(driver_id, vehicle_id, template_id, org_id, type, results, created_at, is_draft, start_mileage) "
+        "SELECT (SELECT min(id) FROM inspection_app.\"user\") + g % 50, "
+        "       (SELECT min(id) FROM inspection_app.vehicles) + g % 50, "
+        "       (SELECT min(id) FROM inspection_app.templates) + g % 20, "
+        "       :org, 'pre-trip', '{}', now() - g * interval '1 minute', g % 25 = 0, g "
+        "FROM generate_series(1, 5000) g"), {"org": org_id})
+    session.commit()
+    session.execute(text("ANALYZE"))
+    return session
+
+
+@pytest.mark.parametrize("index, query", ACCESS_PATTERNS, ids=[p[0] for p in ACCESS_PATTERNS])
+def test_hot_path_query_uses_index(populated, index, query):
+    session = populated
+    # Still small tables, so stop the planner from preferring a sequential scan
+    session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(row[0] for row in session.execute(text(f"EXPLAIN {query}")))
+    session.rollback()
+
+    assert index in plan, plan
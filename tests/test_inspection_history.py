@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete
+from models import InspectionResult
+from models.inspection_photos import InspectionPhoto
+from models.vehicle_latest_state import VehicleLatestState
+
+
+def _seed_inspections(session, fleet, count):
+    items = fleet["items"]
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        inspection = InspectionResult(
+            driver_id=fleet["driver"].id, vehicle_id=fleet["vehicle"].id,
+            template_id=fleet["template"].id, org_id=fleet["org"].id,
+            type="pre-trip", is_draft=False, status="pass", start_mileage=1000 + i,
+            results={str(item.id): "pass" for item in items},
+            created_at=now - timedelta(minutes=i),
+        )
+        session.add(inspection)
+        session.flush()
+        session.add_all([
+            InspectionPhoto(inspection_id=inspection.id, inspection_item_id=item.id,
+                            driver_id=fleet["driver"].id, url=f"https://example.com/{inspection.id}/{item.id}.jpg")
+            for item in items[:2]
+        ])
+    session.commit()
+
+
+def _history_query_count(client, headers, count_queries, limit):
+    # Warm the template cache first so both sizes are measured in the same state
+    client.get(f"/inspections/history?limit={limit}", headers=headers)
+    with count_queries() as queries:
+        response = client.get(f"/inspections/history?limit={limit}", headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()["inspections"]) == limit
+    return queries.count
+
+
+def test_history_page_uses_constant_number_of_queries(session, fleet, client, auth_headers, count_queries):
+    _seed_inspections(session, fleet, 12)
+    headers = auth_headers(fleet["admin"])
+
+    small = _history_query_count(client, headers, count_queries, 3)
+    large = _history_query_count(client, headers, count_queries, 12)
+
+    assert small == large
+
+
+def test_history_serializes_item_names_and_photos(session, fleet, client, auth_headers):
+    _seed_inspections(session, fleet, 2)
+
+    response = client.get("/inspections/history", headers=auth_headers(fleet["admin"]))
+
+    inspections = response.get_json()
+    assert len(inspections) == 2
+    first_item = fleet["items"][0]
+    assert inspections[0]["results"][str(first_item.id)] == {"name": first_item.name, "answer": "pass"}
+    assert len(inspections[0]["photos"]) == 2
+    assert inspections[0]["photos"][0]["driver"]["first_name"] == "Dan"
+    assert inspections[0]["created_at"].endswith("Z")
+
+
+def test_last_inspection_survives_deleting_the_one_the_state_points_at(session, fleet, client, auth_headers):
+    _seed_inspections(session, fleet, 2)
+    newest, older = InspectionResult.query.order_by(InspectionResult.created_at.desc()).all()
+    VehicleLatestState.record(newest)
+    session.commit()
+    # ON DELETE SET NULL leaves the state row pointing at nothing
+    session.execute(delete(InspectionResult).where(InspectionResult.id == newest.id))
+    session.commit()
+    session.expire_all()
+
+    assert InspectionResult.last_for_vehicle(fleet["vehicle"].id).id == older.id
+    for user in (fleet["admin"], fleet["driver"]):
+        response = client.get(f"/inspections/last/{fleet['vehicle'].id}", headers=auth_headers(user))
+        assert response.get_json()["id"] == older.id
@@ -0,0 +1,30 @@
+import json
+from datetime import date, datetime, time, timedelta, timezone
+import pytest
+from flask import Flask
+from utils.json_provider import OrjsonProvider, SocketJSON, StdlibJSONProvider, orjson
+
+VALUES = {
+    "naive": datetime(2026, 1, 2, 3, 4, 5),
+    "utc": datetime(2026, 1, 2, 3, 4, 5, 120000, tzinfo=timezone.utc),
+    # What psycopg2 returns for timestamptz when the session isn't in UTC
+    "offset": datetime(2026, 1, 2, 5, 4, 5, tzinfo=timezone(timedelta(hours=2))),
+    "day": date(2026, 1, 2),
+    "clock": time(3, 4, 5),
+}
+EXPECTED = {
+    "naive": "2026-01-02T03:04:05Z",
+    "utc": "2026-01-02T03:04:05.120000Z",
+    "offset": "2026-01-02T03:04:05Z",
+    "day": "2026-01-02",
+    "clock": "03:04:05",
+}
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson not installed")
+def test_orjson_matches_stdlib_and_normalizes_to_utc():
+    app = Flask(__name__)
+
+    assert json.loads(StdlibJSONProvider(app).dumps(VALUES)) == EXPECTED
+    assert json.loads(OrjsonProvider(app).dumps(VALUES)) == EXPECTED
+    assert json.loads(SocketJSON.dumps(VALUES)) == EXPECTED
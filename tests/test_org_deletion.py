@@ -0,0 +1,50 @@
+from extensions import db
+from models import Organization, User, Vehicle
+from models.org_deletion_job import OrgDeletionJob
+from utils import org_deletion
+
+
+def test_start_spawns_a_runner_only_for_a_new_job(session, fleet, monkeypatch):
+    spawned = []
+    monkeypatch.setattr(org_deletion, "spawn", spawned.append)
+    org_id, admin_id = fleet["org"].id, fleet["admin"].id
+
+    first = org_deletion.start(org_id, admin_id)
+    second = org_deletion.start(org_id, admin_id)
+
+    assert second.id == first.id
+    assert spawned == [first.id]
+
+
+def test_run_deletes_org_and_detaches_members(session, fleet):
+    org_id, driver_id = fleet["org"].id, fleet["driver"].id
+    job = OrgDeletionJob(org_id=org_id, status="queued", progress={})
+    session.add(job)
+    session.commit()
+
+    assert org_deletion.run_or_fail(job.id)
+
+    session.expire_all()
+    assert db.session.get(Organization, org_id) is None
+    assert db.session.get(User, driver_id).org_id is None
+    assert Vehicle.query.filter_by(org_id=org_id).count() == 0
+    assert db.session.get(OrgDeletionJob, job.id).status == "done"
+
+
+def test_resume_cli_marks_failing_jobs_failed(app, session, fleet, monkeypatch):
+    job = OrgDeletionJob(org_id=fleet["org"].id, status="running", progress={})
+    session.add(job)
+    session.commit()
+
+    def boom(job_id):
+        raise RuntimeError("lost connection")
+    monkeypatch.setattr(org_deletion, "run", boom)
+
+    result = app.test_cli_runner().invoke(args=["resume-org-deletions"])
+
+    assert result.exit_code == 0, result.output
+    assert "1 failed" in result.output
+    session.expire_all()
+    failed = db.session.get(OrgDeletionJob, job.id)
+    assert failed.status == "failed"
+    assert failed.error == "lost connection"
@@ -0,0 +1,42 @@
+import io
+import pytest
+from PIL import Image
+from extensions import db
+from models import InspectionResult
+from models.inspection_photos import InspectionPhoto
+from utils import photo_uploads
+
+
+@pytest.fixture
+def notified(monkeypatch):
+    calls = []
+    monkeypatch.setattr(photo_uploads, "notify_photo_processed", lambda org_id, photo: calls.append((org_id, photo)))
+    return calls
+
+
+def _pending_photo(session, fleet, tmp_path):
+    inspection = InspectionResult(driver_id=fleet["driver"].id, vehicle_id=fleet["vehicle"].id,
+                                  template_id=fleet["template"].id, type="pre-trip", results={},
+                                  start_mileage=1000, is_draft=True)
+    session.add(inspection)
+    session.flush()
+    photo = InspectionPhoto(inspection_id=inspection.id, driver_id=fleet["driver"].id, status="pending")
+    session.add(photo)
+    session.commit()
+
+    spool = tmp_path / "spool.jpg"
+    buf = io.BytesIO()
+    Image.new("RGB", (40, 30), "red").save(buf, format="JPEG")
+    spool.write_bytes(buf.getvalue())
+    return photo.id, str(spool)
+
+
+@pytest.mark.parametrize("org", [True, False], ids=["org", "no_org"])
+def test_process_upload_notifies_only_org_members(session, fleet, tmp_path, notified, org):
+    photo_id, spool = _pending_photo(session, fleet, tmp_path)
+    org_id = fleet["org"].id if org else None
+
+    photo_uploads.process_upload(photo_id, spool, f"inspections/{photo_id}.jpg", "image/jpeg", org_id)
+
+    assert db.session.get(InspectionPhoto, photo_id).status == "ready"
+    assert [call[0] for call in notified] == ([org_id] if org else [])
@@ -0,0 +1,125 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+import pytest
+from flask_jwt_extended import create_refresh_token
+from extensions import socketio
+from models import InspectionResult
+from sockets import org_events
+from sockets.dispatcher import dispatcher
+from sockets.manager import LocalPubSubManager
+
+
+@pytest.fixture
+def emitted(app, monkeypatch):
+    """Socket emits as a Redis/Kombu manager would publish them: through stdlib json."""
+    sent = []
+
+    def emit(event, data, room=None, **kwargs):
+        sent.append({"event": event, "room": room, "data": json.loads(json.dumps(data))})
+
+    monkeypatch.setattr(socketio, "emit", emit)
+    # Flush explicitly instead of after the coalescing window
+    monkeypatch.setattr(socketio, "start_background_task", lambda *args, **kwargs: None)
+    return sent
+
+
+def test_inspection_delta_survives_json_round_trip(emitted):
+    inspection = InspectionResult(
+        id=7, driver_id=1, vehicle_id=2, org_id=3, type="pre-trip", status="pass",
+        start_mileage=1200, results={}, driver_full_name="Dan Driver",
+        created_at=datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    )
+
+    org_events.notify_inspection_created(3, inspection.to_dict())
+    dispatcher.flush(org_events.role_room(3, "admin"))
+
+    [message] = emitted
+    assert message["event"] == "inspection_created"
+    assert message["room"] == "org_3_admins"
+    delta = message["data"]["items"][0]
+    assert delta["created_at"] == "2026-01-02T03:04:05Z"
+    assert delta["completed_at"] is None
+    assert delta["fetch_url"] == "/inspections/7"
+
+
+def test_local_pubsub_manager_round_trips_messages_through_json():
+    manager = LocalPubSubManager(channel="test-json-round-trip")
+    manager._publish({"method": "emit", "event": "ping", "data": {"n": 1}})
+
+    assert json.loads(next(manager._listen())) == {"method": "emit", "event": "ping", "data": {"n": 1}}
+    with pytest.raises(TypeError):
+        manager._publish({"method": "emit", "data": {"at": datetime.now(timezone.utc)}})
+
+
+class _Node:
+    """Just enough of a socketio.Server for a manager to listen and disconnect."""
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, manager):
+        self.disconnected = []
+        self.manager = manager
+        manager.set_server(self)
+
+    def start_background_task(self, target):
+        threading.Thread(target=target, daemon=True).start()
+
+    def disconnect(self, sid, namespace=None, ignore_queue=False):
+        self.disconnected.append(sid)
+        self.manager.basic_disconnect(sid, namespace)
+
+
+def test_closing_a_user_room_disconnects_its_sockets_on_every_node():
+    sender = _Node(LocalPubSubManager(channel="test-evict"))
+    receiver = _Node(LocalPubSubManager(channel="test-evict"))
+    receiver.manager.initialize()
+    receiver.manager.rooms["/"] = {}
+    for sid, room in (("s1", "user_5"), ("s2", "user_6"), ("s3", "org_1")):
+        receiver.manager.basic_enter_room(sid, "/", None, eio_sid=sid)
+        receiver.manager.basic_enter_room(sid, "/", room)
+
+    sender.manager.close_room("user_5", "/")
+    sender.manager.close_room("org_1", "/")
+    deadline = time.monotonic() + 5
+    while "org_1" in receiver.manager.rooms["/"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert receiver.disconnected == ["s1"]
+    assert "s3" in dict(receiver.manager.get_participants("/", None))
+
+
+def _socket(app, token=None):
+    return socketio.test_client(app, auth={"token": token} if token else None)
+
+
+def test_connect_without_valid_token_is_refused(app):
+    assert not _socket(app).is_connected()
+    assert not _socket(app, "not-a-token").is_connected()
+
+
+def test_connect_with_refresh_token_is_refused(app, session, fleet):
+    with app.app_context():
+        token = create_refresh_token(identity=str(fleet["driver"].id))
+
+    assert not _socket(app, token).is_connected()
+
+
+def test_member_is_disconnected_when_leaving_org(app, session, fleet, client, auth_headers):
+    headers = auth_headers(fleet["driver"])
+    token = headers["Authorization"].split()[1]
+    sock = _socket(app, token)
+    org_id = fleet["org"].id
+    rooms = socketio.server.manager.rooms["/"]
+    assert sock.is_connected()
+    assert len(rooms[org_events.org_room(org_id)]) == 1
+    assert len(rooms[org_events.role_room(org_id, "driver")]) == 1
+
+    response = client.post("/organizations/leave", headers=headers)
+
+    assert response.status_code == 200
+    assert not sock.is_connected()
+    assert org_events.org_room(org_id) not in rooms
+    assert org_events.role_room(org_id, "driver") not in rooms
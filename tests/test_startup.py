@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+from conftest import ROOT
+
+# Cumulative `import app` time allowed, in microseconds. Generous enough for a
+# cold CI runner; pulling firebase/grpc back onto the import path blows it.
+IMPORT_BUDGET_US = int(os.getenv("IMPORT_TIME_BUDGET_US", 3_000_000))
+LAZY_MODULES = ("firebase_admin", "sendgrid", "google.cloud")
+
+
+def _import_times():
+    env = dict(os.environ, STORAGE_BACKEND="firebase", EMAIL_TRANSPORT="sendgrid")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_skips_heavy_sdks_and_stays_within_budget():
+    times = _import_times()
+
+    loaded = [name for name in times if name.startswith(LAZY_MODULES)]
+    assert loaded == []
+    assert times["app"] < IMPORT_BUDGET_US, f"import app took {times['app']}us"
@@ -0,0 +1,37 @@
+from models import Organization
+from utils import template_cache
+
+
+def test_edit_bumps_version_and_serves_new_items(session, fleet, client, auth_headers):
+    headers = auth_headers(fleet["admin"])
+    template = fleet["template"]
+    template_id = template.id
+    # Populate the cache for the current version and plant a stale entry for the next one
+    template_cache.item_names(template_id, 1)
+    template_cache.item_names(template_id, 2)
+
+    response = client.put(f"/templates/{template_id}/edit", headers=headers, json={
+        "name": "Pre-trip v2",
+        "items": [{"name": "Tires", "question": "Tires ok?"}],
+    })
+
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()["template"]
+    assert body["version"] == 2
+    assert [item["name"] for item in body["items"]] == ["Tires"]
+    assert list(template_cache.item_names(template_id, 2).values()) == ["Tires"]
+
+
+def test_moving_a_template_to_another_org_is_not_served_stale(session, fleet):
+    template = fleet["template"]
+    assert template_cache.template_dict(template)["org_id"] == fleet["org"].id
+    other = Organization(name="Other Fleet")
+    session.add(other)
+    session.flush()
+
+    template.org_id = other.id
+    session.commit()
+
+    cached = template_cache.template_dict(template)
+    assert cached["version"] == 2
+    assert cached["org_id"] == other.id
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def wait_stats(self):
+        with self._stats_lock:
+            return {
+                "checkouts_total": self._checkouts,
+                "timeouts_total": self._timeouts,
+                "wait_seconds_total": round(self._wait_total, 6),
+                "wait_seconds_max": round(self._wait_max, 6),
+                "wait_seconds_avg": round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+            }
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def engine_options_from_env():
+    """SQLALCHEMY_ENGINE_OPTIONS built from DB_* environment variables.
+
+    DB_POOLER_MODE=1 is for running behind PgBouncer/Supavisor in transaction
+    mode: the external pooler owns the connections, so we use NullPool and skip
+    startup options the pooler would reject. Set statement_timeout on the
+    database role instead (ALTER ROLE ... SET statement_timeout = ...).
+    psycopg2 never uses server-side prepared statements, so nothing else is needed.
+    """
+    if _env_bool("DB_POOLER_MODE", False):
+        return {"poolclass": NullPool}
+
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        # Render's Postgres drops idle connections; recycle well before that
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 300)),
+    }
+    # Off unless set; migrations (migrations/env.py) always run without it
+    statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+    if statement_timeout:
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return options
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    if isinstance(pool, TimedQueuePool):
+        stats.update(pool.wait_stats())
+    return stats
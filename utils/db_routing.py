@@ -0,0 +1,84 @@
+import threading
+from cachetools import TTLCache
+from flask import current_app, g, has_app_context, request
+from flask_jwt_extended import decode_token, get_jwt
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Delete, Insert, Update
+
+# Bind key for the read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = "replica"
+
+# app.extensions key for the TTLCache of users who wrote recently
+RECENT_WRITERS = "db_routing_recent_writers"
+_recent_writers_lock = threading.Lock()
+
+
+class RoutingSession(Session):
+    """Sends reads to the replica bind when the current request allows it.
+
+    Flushes and explicit INSERT/UPDATE/DELETE statements always go to the
+    primary, so a handler that writes by accident stays correct.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context() and g.get("db_use_replica"):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None and not self._flushing and not isinstance(clause, (Insert, Update, Delete)):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _request_identity():
+    # Decode the bearer token without loading the user; routing is decided
+    # before the JWT user lookup runs so that lookup can use the replica too
+    header = request.headers.get("Authorization", "")
+    if not header.startswith("Bearer "):
+        return None
+    try:
+        return decode_token(header[len("Bearer "):])["sub"]
+    except Exception:
+        return None
+
+
+def use_replica_for_reads(blueprint):
+    """Route GET handlers of a blueprint to the replica, unless the caller wrote recently."""
+
+    @blueprint.before_request
+    def _route_reads_to_replica():
+        if request.method != "GET" or REPLICA_BIND not in current_app.config.get("SQLALCHEMY_BINDS", {}):
+            return
+        identity = _request_identity()
+        if identity is None:
+            # Let the view reject the request on the primary as it always has
+            return
+        with _recent_writers_lock:
+            sticky = str(identity) in current_app.extensions[RECENT_WRITERS]
+        g.db_use_replica = not sticky
+
+
+def init_app(app):
+    # Built here rather than on first use so the lock is never taken twice.
+    # The cache lives in this process only: a read served by another worker
+    # right after a write can still see replica lag, so REPLICA_STICKY_SECONDS
+    # only guarantees read-your-writes when requests stick to one worker.
+    app.extensions[RECENT_WRITERS] = TTLCache(
+        maxsize=app.config.get("REPLICA_STICKY_SIZE", 10000),
+        ttl=app.config.get("REPLICA_STICKY_SECONDS", 5),
+    )
+
+    @app.after_request
+    def _remember_writers(response):
+        # Read-your-writes: pin a user to the primary for REPLICA_STICKY_SECONDS
+        # after a successful write so they don't read their own stale data
+        if request.method in ("GET", "HEAD", "OPTIONS") or response.status_code >= 400:
+            return response
+        if REPLICA_BIND not in app.config.get("SQLALCHEMY_BINDS", {}):
+            return response
+        try:
+            identity = get_jwt().get("sub")
+        except RuntimeError:
+            return response
+        if identity is not None:
+            with _recent_writers_lock:
+                app.extensions[RECENT_WRITERS][str(identity)] = True
+        return response
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+import click
+import eventlet
+from eventlet.queue import LightQueue, Empty
+from flask import current_app
+from extensions import db
+from models.email_outbox import EmailOutbox
+from utils.email_service import get_transport
+
+_wakeups = None
+
+
+def _claim(batch_size, lease_seconds):
+    """Mark a batch of due rows as "sending" and commit, so no row lock is held
+    while talking to the provider. Returns [(id, kind, to_email, subject, html)].
+
+    Rows are picked with FOR UPDATE SKIP LOCKED, so dispatchers in several workers
+    (or the CLI drain command) never claim the same message. The claim is a lease:
+    a "sending" row whose worker died becomes due again after lease_seconds.
+    """
+    now = datetime.utcnow()
+    messages = (EmailOutbox.query
+                .filter(EmailOutbox.status.in_(("pending", "sending")), EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .all())
+    claimed = []
+    for message in messages:
+        message.status = "sending"
+        message.next_attempt_at = now + timedelta(seconds=lease_seconds)
+        claimed.append((message.id, message.kind, message.to_email, message.subject, message.html_content))
+    db.session.commit()
+    return claimed
+
+
+def dispatch_batch():
+    """Send one batch of due outbox messages. Returns how many rows were processed."""
+    config = current_app.config
+    max_attempts = config.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 5)
+    backoff = config.get("EMAIL_OUTBOX_RETRY_BACKOFF", 30)
+    claimed = _claim(config.get("EMAIL_OUTBOX_BATCH_SIZE", 20), config.get("EMAIL_OUTBOX_LEASE_SECONDS", 300))
+    if not claimed:
+        return 0
+
+    transport = get_transport()
+    for message_id, kind, to_email, subject, html_content in claimed:
+        error = None
+        try:
+            transport.send(to_email, subject, html_content)
+        except Exception as e:
+            error = e
+        # Each outcome commits on its own, so a crash mid-batch can't resend the ones already sent
+        message = db.session.get(EmailOutbox, message_id)
+        if error is None:
+            message.mark_sent()
+        else:
+            current_app.logger.warning(
+                "Email %s (%s) failed on attempt %s: %s", message_id, kind, message.attempts + 1, error
+            )
+            message.mark_failed_attempt(error, max_attempts, backoff)
+        db.session.commit()
+    return len(claimed)
+
+
+def drain():
+    """Send everything that is currently due; used by the CLI command."""
+    total = 0
+    while True:
+        count = dispatch_batch()
+        total += count
+        if count == 0:
+            return total
+
+
+def _run(app):
+    while True:
+        try:
+            with app.app_context():
+                count = dispatch_batch()
+        except Exception:
+            app.logger.exception("Email outbox dispatcher failed")
+            count = 0
+        if count:
+            continue  # more may be due; keep going without waiting
+        try:
+            # Sleep until the next poll, or until a request queues new mail
+            _wakeups.get(timeout=app.config.get("EMAIL_OUTBOX_POLL_SECONDS", 10))
+        except Empty:
+            pass
+
+
+def _start(app):
+    global _wakeups
+    if _wakeups is None:
+        _wakeups = LightQueue()
+        eventlet.spawn(_run, app)
+
+
+def init_app(app):
+    """Start the dispatcher with the app; its first pass sends whatever was left
+    due before a restart. CLI commands (flask db upgrade, drain-email-outbox) load
+    the app inside a click context and don't get one.
+    """
+    if app.config.get("EMAIL_OUTBOX_DISPATCHER", True) and click.get_current_context(silent=True) is None:
+        _start(app)
+
+
+def wake():
+    """Nudge the dispatcher to send newly committed mail. Call after the commit that queued it."""
+    app = current_app._get_current_object()
+    if not app.config.get("EMAIL_OUTBOX_DISPATCHER", True):
+        return  # delivery handled by `flask drain-email-outbox` from cron
+    _start(app)
+    if _wakeups.qsize() == 0:
+        _wakeups.put(None)
@@ -1,17 +1,110 @@
+import json
 import os
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, TrackingSettings, ClickTracking
+import smtplib
+import uuid
+from email.message import EmailMessage
+from flask import current_app
+from extensions import db
+from models.email_outbox import EmailOutbox
 
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
 FROM_EMAIL = os.getenv("SENDGRID_FROM_EMAIL")
 FROM_NAME = os.getenv("SENDGRID_FROM_NAME", "DriveCheck")
 FRONTEND_RESET_URL = os.getenv("FRONTEND_RESET_URL", "https://drivecheck.app/reset-password")
 
-def send_reset_email(to_email: str, token: str) -> bool:
-    if not SENDGRID_API_KEY:
-        print("SENDGRID_API_KEY not configured")
-        return False
 
+# --
+# Transports: send(to_email, subject, html_content) raises on failure
+# --
+class SendGridTransport:
+    def __init__(self, api_key, from_email, from_name):
+        self.api_key = api_key
+        self.from_email = from_email
+        self.from_name = from_name
+
+    def send(self, to_email, subject, html_content):
+        if not self.api_key:
+            raise RuntimeError("SENDGRID_API_KEY not configured")
+
+        # Imported here so app startup doesn't pay for sendgrid and its dependencies
+        from sendgrid import SendGridAPIClient
+        from sendgrid.helpers.mail import Mail, TrackingSettings, ClickTracking
+
+        message = Mail(
+            from_email=(self.from_email, self.from_name),
+            to_emails=to_email,
+            subject=subject,
+            html_content=html_content
+        )
+
+        # Disable click tracking so link stays exact
+        message.tracking_settings = TrackingSettings(
+            click_tracking=ClickTracking(enable=False, enable_text=False)
+        )
+
+        # Non-2xx responses raise from the client
+        SendGridAPIClient(self.api_key).send(message)
+
+
+class FileTransport:
+    """Writes each message to a JSON file; for development and tests."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def send(self, to_email, subject, html_content):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}.json")
+        with open(path, "w") as f:
+            json.dump({"to": to_email, "subject": subject, "html": html_content}, f)
+
+
+class SMTPTransport:
+    """Plain SMTP, e.g. a local MailHog/smtp4dev sink."""
+
+    def __init__(self, host, port, from_email):
+        self.host = host
+        self.port = port
+        self.from_email = from_email
+
+    def send(self, to_email, subject, html_content):
+        message = EmailMessage()
+        message["From"] = self.from_email
+        message["To"] = to_email
+        message["Subject"] = subject
+        message.set_content(html_content, subtype="html")
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            smtp.send_message(message)
+
+
+def get_transport():
+    # EMAIL_TRANSPORT: "sendgrid" (default), "file" or "smtp"
+    config = current_app.config
+    transport = config.get("EMAIL_TRANSPORT", "sendgrid")
+    if transport == "sendgrid":
+        return SendGridTransport(SENDGRID_API_KEY, FROM_EMAIL, FROM_NAME)
+    if transport == "file":
+        return FileTransport(config.get("EMAIL_FILE_DIR", "outbox"))
+    if transport == "smtp":
+        return SMTPTransport(
+            config.get("EMAIL_SMTP_HOST", "localhost"),
+            config.get("EMAIL_SMTP_PORT", 1025),
+            FROM_EMAIL or "no-reply@drivecheck.app",
+        )
+    raise ValueError(f"Unknown EMAIL_TRANSPORT '{transport}'")
+
+
+# --
+# Messages
+# --
+def queue_email(kind, to_email, subject, html_content):
+    """Add a message to the outbox in the caller's transaction; it is sent after commit."""
+    message = EmailOutbox(kind=kind, to_email=to_email, subject=subject, html_content=html_content)
+    db.session.add(message)
+    return message
+
+
+def queue_reset_email(to_email: str, token: str):
     # reset_link = f"{FRONTEND_RESET_URL}?token={token}"
     reset_link = f"https://preinspection-api.onrender.com/auth/deep-reset?token={token}"
     # reset_link = f"drivecheck://reset-password?token={token}"
@@ -21,12 +114,12 @@ def send_reset_email(to_email: str, token: str) -> bool:
     <div style="font-family: Arial, sans-serif; padding: 20px;">
         <h2 style="color: #2b6cb0;">DriveCheck Password Reset</h2>
         <p>Hello,</p>
-        <p>We received a request to reset your DriveCheck password. 
+        <p>We received a request to reset your DriveCheck password.
         Click the button below to choose a new password:</p>
         <p style="text-align: center;">
-            <a href="{reset_link}" 
-               style="background-color: #2b6cb0; color: white; 
-                      padding: 10px 20px; text-decoration: none; 
+            <a href="{reset_link}"
+               style="background-color: #2b6cb0; color: white;
+                      padding: 10px 20px; text-decoration: none;
                       border-radius: 5px;">Reset Password</a>
         </p>
         <p>If you didn’t request this, you can safely ignore this email.</p>
@@ -34,24 +127,4 @@ def send_reset_email(to_email: str, token: str) -> bool:
     </div>
     """
 
-    message = Mail(
-        from_email=(FROM_EMAIL, FROM_NAME),
-        to_emails=to_email,
-        subject=subject,
-        html_content=html_content
-    )
-
-    # Disable click tracking so link stays exact
-    tracking_settings = TrackingSettings(
-        click_tracking=ClickTracking(enable=False, enable_text=False)
-    )
-    message.tracking_settings = tracking_settings
-    
-    try:
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
-        response = sg.send(message)
-        print(f"Password reset email sent to {to_email}, status {response.status_code}")
-        return 200 <= response.status_code < 300
-    except Exception as e:
-        print(f"Error sending reset email: {e}")
-        return False
+    return queue_email("password_reset", to_email, subject, html_content)
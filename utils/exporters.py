@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime
+
+# Inspection columns included in every export, ahead of the per-item answer columns
+BASE_COLUMNS = [
+    "id", "created_at", "completed_at", "type", "status", "vehicle_id", "driver_id",
+    "driver_full_name", "template_id", "start_mileage", "odometer_verified",
+    "fuel_level", "fuel_notes", "location", "notes",
+]
+UNMAPPED_COLUMN = "unmapped_results"
+# Item answer columns are prefixed so an item named e.g. "status" or "notes"
+# can't overwrite the inspection column of the same name
+ITEM_COLUMN_PREFIX = "item:"
+
+
+def item_columns(item_names_by_template):
+    """Build (column names, {item_id: column}) from {template_id: {item_id: name}}.
+
+    Columns are "item:<name>"; items that share a name across templates share a column.
+    Items whose name repeats within one template get "item:<name>#<item_id>" each,
+    so neither answer overwrites the other.
+    """
+    columns, column_for_item = [], {}
+    for names in item_names_by_template.values():
+        counts = Counter(names.values())
+        for item_id, name in names.items():
+            column = f"{ITEM_COLUMN_PREFIX}{name}"
+            if counts[name] > 1:
+                column = f"{column}#{item_id}"
+            if column not in columns:
+                columns.append(column)
+            column_for_item[item_id] = column
+    return columns, column_for_item
+
+
+def _scalar(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def flatten(row, column_for_item):
+    """Flatten one inspection row (a mapping of BASE_COLUMNS + results) into a flat dict."""
+    record = {col: _scalar(row[col]) for col in BASE_COLUMNS}
+    unmapped = {}
+    for item_id, answer in (row["results"] or {}).items():
+        column = column_for_item.get(int(item_id)) if str(item_id).isdigit() else None
+        if column is None:
+            unmapped[item_id] = answer
+        else:
+            record[column] = _scalar(answer)
+    record[UNMAPPED_COLUMN] = json.dumps(unmapped) if unmapped else None
+    return record
+
+
+def csv_stream(batches, columns):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(batch)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    yield buf.getvalue()
+
+
+def ndjson_stream(batches, columns):
+    for batch in batches:
+        yield "".join(json.dumps(record) + "\n" for record in batch)
+
+
+def columnar_stream(batches, columns):
+    # First line names the columns; each following line holds one batch column-major
+    yield json.dumps({"columns": columns}) + "\n"
+    for batch in batches:
+        data = [[record.get(col) for record in batch] for col in columns]
+        yield json.dumps({"rows": len(batch), "data": data}) + "\n"
+
+
+FORMATS = {
+    "csv": (csv_stream, "text/csv"),
+    "ndjson": (ndjson_stream, "application/x-ndjson"),
+    "columnar": (columnar_stream, "application/x-ndjson"),
+}
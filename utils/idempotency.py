@@ -0,0 +1,115 @@
+from functools import wraps
+from datetime import datetime, timedelta
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from extensions import db
+from models.idempotency_key import IdempotencyKey
+
+
+def _replay(record):
+    response = make_response(jsonify(record.response), record.status_code)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+# Claims, results and releases are written on their own connection and committed
+# there, so the request's session transaction is left entirely to the view.
+
+def _claim(user_id, key, endpoint):
+    """Insert an in-flight row for the key, or take over an expired one or one whose
+    lease has gone stale (its request died without storing or releasing it).
+
+    Returns (id, lease) or None; lease is the locked_at value that proves ownership.
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(hours=current_app.config.get("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+    stale = now - timedelta(seconds=current_app.config.get("IDEMPOTENCY_LEASE_SECONDS", 60))
+    table = IdempotencyKey.__table__
+    stmt = insert(table).values(user_id=user_id, key=key, endpoint=endpoint, created_at=now,
+                                expires_at=expires_at, locked_at=now)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_idempotency_keys_user_id_key",
+        set_={"endpoint": endpoint, "status_code": None, "response": None,
+              "created_at": now, "expires_at": expires_at, "locked_at": now},
+        where=or_(table.c.expires_at < now,
+                  and_(table.c.status_code.is_(None), table.c.locked_at < stale)),
+    ).returning(table.c.id)
+    with db.engine.begin() as conn:
+        claimed = conn.execute(stmt).scalar()
+    return (claimed, now) if claimed is not None else None
+
+
+def _owned(record_id, lease):
+    # A request whose lease was taken over must not touch the new owner's row
+    table = IdempotencyKey.__table__
+    return and_(table.c.id == record_id, table.c.locked_at == lease)
+
+
+def _store(claim, status_code, body):
+    table = IdempotencyKey.__table__
+    with db.engine.begin() as conn:
+        conn.execute(update(table).where(_owned(*claim))
+                     .values(status_code=status_code, response=body, locked_at=None))
+
+
+def _release(claim):
+    db.session.rollback()
+    with db.engine.begin() as conn:
+        conn.execute(delete(IdempotencyKey.__table__).where(_owned(*claim)))
+
+
+def idempotent(view):
+    """Replay the stored response when a write is retried with the same Idempotency-Key.
+
+    Must be applied below @jwt_required(). Only successful (2xx) JSON responses are
+    stored; failures release the key so the client can retry.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > 128:
+            return jsonify({"error": "Idempotency-Key must be at most 128 characters"}), 400
+
+        user_id = int(get_jwt_identity())
+        endpoint = request.endpoint
+
+        # Retries of a completed request cost this one indexed lookup
+        record = (IdempotencyKey.query
+                  .filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key,
+                          IdempotencyKey.expires_at >= datetime.utcnow())
+                  .first())
+        claim = None
+        if record is None or record.status_code is None:
+            claim = _claim(user_id, key, endpoint)
+        if claim is None:
+            record = (IdempotencyKey.query.filter_by(user_id=user_id, key=key)
+                      .populate_existing().first())
+            if record is None:
+                # The row that beat our claim was released or purged in between
+                claim = _claim(user_id, key, endpoint)
+                if claim is None:
+                    return jsonify({"error": "A request with this Idempotency-Key is still in progress"}), 409
+        if claim is None:
+            if record.endpoint != endpoint:
+                return jsonify({"error": "Idempotency-Key was already used for a different request"}), 422
+            if record.status_code is None:
+                return jsonify({"error": "A request with this Idempotency-Key is still in progress"}), 409
+            return _replay(record)
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            _release(claim)
+            raise
+
+        if 200 <= response.status_code < 300 and response.is_json:
+            _store(claim, response.status_code, response.get_json())
+        else:
+            _release(claim)
+        return response
+
+    return wrapper
@@ -0,0 +1,57 @@
+from io import BytesIO
+
+# Output format -> (file extension, content type)
+FORMATS = {"JPEG": ("jpg", "image/jpeg"), "PNG": ("png", "image/png")}
+
+
+def _encode(image, fmt, quality):
+    buf = BytesIO()
+    if fmt == "PNG":
+        image.save(buf, format="PNG", optimize=True)
+    else:
+        image.save(buf, format="JPEG", quality=quality, optimize=True)
+    buf.seek(0)
+    return buf
+
+
+def _has_alpha(image):
+    return image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+
+
+def downscale(fileobj, max_dimension, thumbnail_sizes, quality=85):
+    """Return (main, {size: thumbnail}, format), or None if the file can't be processed.
+
+    The main image is capped at max_dimension on its longest side; thumbnails are
+    cut from the already downscaled image so the original is only decoded once.
+    Images with transparency stay PNG, everything else becomes JPEG. Anything
+    that fails to decode, resize or encode (including decompression bombs)
+    returns None so the caller can keep the original bytes.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        image = Image.open(fileobj)
+        # Let the JPEG decoder scale down while decoding instead of at full size
+        image.draft("RGB", (max_dimension, max_dimension))
+        image = ImageOps.exif_transpose(image)
+
+        if _has_alpha(image):
+            fmt = "PNG"
+            if image.mode != "RGBA":
+                image = image.convert("RGBA")
+        else:
+            fmt = "JPEG"
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+
+        image.thumbnail((max_dimension, max_dimension))
+        main = _encode(image, fmt, quality)
+
+        thumbnails = {}
+        for size in sorted(thumbnail_sizes, reverse=True):
+            image.thumbnail((size, size))
+            thumbnails[size] = _encode(image, fmt, quality)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError):
+        return None
+
+    return main, thumbnails, fmt
@@ -0,0 +1,87 @@
+import time
+from flask import g, has_request_context, request
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Metrics live in the default registry and are created once per process;
+# init_app only attaches the hooks, so calling create_app twice is safe.
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled",
+    ["blueprint", "endpoint", "method", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time spent in the view and request hooks",
+    ["blueprint", "endpoint", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size (streamed responses are skipped)",
+    ["blueprint", "endpoint"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+DB_QUERIES = Histogram(
+    "db_queries_per_request", "SQL statements executed per request",
+    ["blueprint", "endpoint"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+DB_TIME = Histogram(
+    "db_query_seconds_per_request", "Total SQL execution time per request",
+    ["blueprint", "endpoint"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+STORAGE_UPLOAD_SECONDS = Histogram(
+    "storage_upload_duration_seconds", "Time to upload one file to photo storage",
+    ["backend"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+SOCKET_EMITS = Counter(
+    "socketio_emits_total", "Socket.IO emits sent by the org event dispatcher",
+    ["event"],
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    # Background workers (photo uploads, etc.) run without a request
+    if has_request_context():
+        g.db_query_count = g.get("db_query_count", 0) + 1
+        g.db_query_time = g.get("db_query_time", 0.0) + elapsed
+
+
+def _labels():
+    endpoint = request.endpoint or "unmatched"
+    return request.blueprint or "app", endpoint
+
+
+def init_app(app):
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+        g.db_query_count = 0
+        g.db_query_time = 0.0
+
+    @app.after_request
+    def _record_request(response):
+        start = g.get("request_start")
+        if start is None:
+            return response
+        blueprint, endpoint = _labels()
+        REQUESTS.labels(blueprint, endpoint, request.method, response.status_code).inc()
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - start)
+        if response.content_length is not None:
+            RESPONSE_SIZE.labels(blueprint, endpoint).observe(response.content_length)
+        DB_QUERIES.labels(blueprint, endpoint).observe(g.get("db_query_count", 0))
+        DB_TIME.labels(blueprint, endpoint).observe(g.get("db_query_time", 0.0))
+        return response
+
+
+def render_latest():
+    """Body and content type for a Prometheus scrape."""
+    return generate_latest(), CONTENT_TYPE_LATEST
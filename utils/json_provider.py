@@ -0,0 +1,82 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time, timezone
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib provider is used without it
+    orjson = None
+
+
+def utc_isoformat(value):
+    """Datetimes are stored as UTC; naive ones are treated as UTC. Always ends in "Z"."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat() + "Z"
+
+
+def _default(value):
+    # Types the encoders leave to us (orjson passes datetimes through)
+    if isinstance(value, datetime):
+        return utc_isoformat(value)
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's provider with datetimes as UTC ISO 8601 instead of HTTP dates."""
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(JSONProvider):
+    """orjson-backed provider producing the same output as StdlibJSONProvider."""
+    mimetype = "application/json"
+    # Datetimes go through _default: orjson's native encoding keeps an aware
+    # value's own offset (the DB session's time zone) instead of converting to UTC
+    option = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Skip the bytes -> str -> bytes round trip jsonify would otherwise do
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=self.option | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class SocketJSON:
+    """json-module stand-in for python-socketio packets, matching the HTTP encoding."""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default, option=OrjsonProvider.option).decode()
+        return json.dumps(obj, default=_default, **kwargs)
+
+    @staticmethod
+    def loads(s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+
+def init_app(app):
+    # JSON_PROVIDER: "orjson" (default when installed) or "stdlib"
+    if orjson is not None and app.config.get("JSON_PROVIDER", "orjson") == "orjson":
+        app.json = OrjsonProvider(app)
+    else:
+        app.json = StdlibJSONProvider(app)
@@ -0,0 +1,172 @@
+from datetime import datetime
+from uuid import uuid4
+import eventlet
+from flask import current_app
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.orm.attributes import flag_modified
+from extensions import db
+from models.inspection_photos import InspectionPhoto
+from models.inspection_results import InspectionResult
+from models.org_deletion_job import OrgDeletionJob
+from models.organization import Organization
+from models.template import Template
+from models.template_item import TemplateItem
+from models.user import User
+from models.vehicle import Vehicle
+from models.vehicle_latest_state import VehicleLatestState
+from utils import template_cache
+from utils.user_cache import invalidate_user
+from sockets.org_events import evict_user
+
+
+def start(org_id, requested_by):
+    """Create a deletion job for the org and run it, or return the one already in progress.
+
+    An existing job already has a runner (or is picked up by resume-org-deletions),
+    so a repeated request doesn't start a second one on the same org.
+    """
+    job = (OrgDeletionJob.query
+           .filter(OrgDeletionJob.org_id == org_id, OrgDeletionJob.status.in_(("queued", "running")))
+           .first())
+    if job is not None:
+        return job
+    job = OrgDeletionJob(org_id=org_id, requested_by=requested_by, status="queued", progress={})
+    db.session.add(job)
+    db.session.commit()
+    spawn(job.id)
+    return job
+
+
+def spawn(job_id):
+    app = current_app._get_current_object()
+    eventlet.spawn(_run, app, job_id)
+
+
+def _run(app, job_id):
+    with app.app_context():
+        run_or_fail(job_id)
+
+
+def run_or_fail(job_id):
+    """run() the job, marking it failed (for a later resume) if it raises. Returns True on success."""
+    try:
+        run(job_id)
+        return True
+    except Exception as e:
+        current_app.logger.exception("Organization deletion job %s failed", job_id)
+        db.session.rollback()
+        job = db.session.get(OrgDeletionJob, job_id)
+        if job:
+            job.status = "failed"
+            job.error = str(e)[:2000]
+            db.session.commit()
+        return False
+
+
+def _batched(job, step, build_statement):
+    """Run build_statement(batch_size) until it affects fewer rows than a full batch.
+
+    Each batch commits on its own (together with the job's progress) so locks and
+    transactions stay short and a restarted job resumes where it left off.
+    """
+    batch_size = current_app.config.get("ORG_DELETION_BATCH_SIZE", 1000)
+    job.step = step
+    total = 0
+    while True:
+        count = db.session.execute(build_statement(batch_size)).rowcount
+        total += count
+        job.progress[step] = job.progress.get(step, 0) + count
+        flag_modified(job, "progress")
+        db.session.commit()
+        if count < batch_size:
+            return total
+        eventlet.sleep(0)  # let requests run between batches
+
+
+def _ids(model, *criteria):
+    # One batch of primary keys matching criteria, for UPDATE/DELETE ... WHERE id IN (...)
+    return lambda n: select(model.id).where(*criteria).limit(n).scalar_subquery()
+
+
+def run(job_id):
+    job = db.session.get(OrgDeletionJob, job_id)
+    if job is None or job.status == "done":
+        return
+    org_id = job.org_id
+    job.status = "running"
+    job.progress = job.progress or {}
+    db.session.commit()
+
+    org = db.session.get(Organization, org_id)
+    if org is not None:
+        # Stop new members joining while the org is torn down
+        org.invite_code = str(uuid4())[:8]
+        org.admin_invite_code = None
+        db.session.commit()
+
+    # Members: detach and demote admins
+    user_ids = db.session.scalars(select(User.id).where(User.org_id == org_id)).all()
+    member_ids = _ids(User, User.org_id == org_id)
+    _batched(job, "users", lambda n: update(User)
+             .where(User.id.in_(member_ids(n)))
+             .values(org_id=None, role=case((User.role == "admin", "driver"), else_=User.role))
+             .execution_options(synchronize_session=False))
+    invalidate_user(*user_ids)
+    evict_user(*user_ids)
+
+    # Vehicles: org-owned ones are deleted, ones a driver created go back to that driver
+    owned_ids = _ids(Vehicle, Vehicle.org_id == org_id, Vehicle.created_by_user_id.is_(None))
+    _batched(job, "vehicles_deleted", lambda n: delete(Vehicle)
+             .where(Vehicle.id.in_(owned_ids(n)))
+             .execution_options(synchronize_session=False))
+    vehicle_ids = _ids(Vehicle, Vehicle.org_id == org_id)
+    _batched(job, "vehicles_detached", lambda n: update(Vehicle)
+             .where(Vehicle.id.in_(vehicle_ids(n)))
+             .values(org_id=None)
+             .execution_options(synchronize_session=False))
+    _batched(job, "vehicle_state_detached", lambda n: update(VehicleLatestState)
+             .where(VehicleLatestState.vehicle_id.in_(
+                 select(VehicleLatestState.vehicle_id).where(VehicleLatestState.org_id == org_id).limit(n).scalar_subquery()))
+             .values(org_id=None)
+             .execution_options(synchronize_session=False))
+
+    # Inspections are retained, detached from the org's templates and the org itself
+    org_templates = select(Template.id).where(Template.org_id == org_id)
+    templated_ids = _ids(InspectionResult, InspectionResult.template_id.in_(org_templates))
+    _batched(job, "inspections_template_detached", lambda n: update(InspectionResult)
+             .where(InspectionResult.id.in_(templated_ids(n)))
+             .values(template_id=None)
+             .execution_options(synchronize_session=False))
+    inspection_ids = _ids(InspectionResult, InspectionResult.org_id == org_id)
+    _batched(job, "inspections_org_detached", lambda n: update(InspectionResult)
+             .where(InspectionResult.id.in_(inspection_ids(n)))
+             .values(org_id=None)
+             .execution_options(synchronize_session=False))
+
+    # Photos are kept too, unlinked from the template items about to be deleted
+    org_items = select(TemplateItem.id).where(TemplateItem.template_id.in_(org_templates))
+    photo_ids = _ids(InspectionPhoto, InspectionPhoto.inspection_item_id.in_(org_items))
+    _batched(job, "photos_item_detached", lambda n: update(InspectionPhoto)
+             .where(InspectionPhoto.id.in_(photo_ids(n)))
+             .values(inspection_item_id=None)
+             .execution_options(synchronize_session=False))
+
+    # Templates and their items
+    templates = db.session.execute(select(Template.id, Template.version).where(Template.org_id == org_id)).all()
+    item_ids = _ids(TemplateItem, TemplateItem.template_id.in_(org_templates))
+    _batched(job, "template_items_deleted", lambda n: delete(TemplateItem)
+             .where(TemplateItem.id.in_(item_ids(n)))
+             .execution_options(synchronize_session=False))
+    template_ids = _ids(Template, Template.org_id == org_id)
+    _batched(job, "templates_deleted", lambda n: delete(Template)
+             .where(Template.id.in_(template_ids(n)))
+             .execution_options(synchronize_session=False))
+    for template_id, version in templates:
+        template_cache.invalidate(template_id, version)
+
+    job.step = "organization_deleted"
+    db.session.execute(delete(Organization).where(Organization.id == org_id)
+                       .execution_options(synchronize_session=False))
+    job.status = "done"
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
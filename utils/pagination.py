@@ -0,0 +1,38 @@
+import base64
+from datetime import datetime
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at, record_id) -> str:
+    raw = f"{created_at.isoformat()}|{record_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    """Return (created_at, id) from an opaque cursor, raising ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, record_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(record_id)
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE) -> int:
+    if value is None:
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, maximum)
+
+
+def keyset_page(query, created_col, id_col, cursor=None):
+    """Apply newest-first (created_at, id) keyset ordering and the cursor filter to a query."""
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_col, id_col) < tuple_(created_at, record_id))
+    return query.order_by(created_col.desc(), id_col.desc())
@@ -0,0 +1,53 @@
+import os
+import threading
+import bcrypt
+from eventlet import tpool
+from flask import current_app
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def _get_slots():
+    # Bounds concurrent hashes so a login storm can't occupy every tpool thread
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                limit = current_app.config.get("PASSWORD_HASH_CONCURRENCY") or os.cpu_count() or 2
+                _slots = threading.BoundedSemaphore(limit)
+    return _slots
+
+
+def _offload(fn, *args):
+    # bcrypt is CPU-bound; run it on a native thread so the eventlet hub keeps
+    # serving other requests and sockets while it works
+    with _get_slots():
+        return tpool.execute(fn, *args)
+
+
+def _rounds():
+    return current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
+
+
+def hash_password(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=_rounds())
+    return _offload(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+
+def check_password(password_hash: str, password: str) -> bool:
+    if not password_hash:
+        return False
+    try:
+        return _offload(bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8"))
+    except ValueError:
+        # Malformed hash or a password bcrypt refuses (over 72 bytes)
+        return False
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """True when the stored hash was made with a different cost than BCRYPT_LOG_ROUNDS."""
+    try:
+        return int(password_hash.split("$")[2]) != _rounds()
+    except (AttributeError, IndexError, ValueError):
+        return True
@@ -0,0 +1,120 @@
+import os
+import eventlet
+from eventlet import tpool
+from eventlet.queue import Queue, Full
+from flask import current_app
+from extensions import db
+from models.inspection_photos import InspectionPhoto
+from utils.images import FORMATS, downscale
+from utils.storage import get_storage
+from sockets.org_events import notify_photo_processed
+
+_queue = None
+
+
+def _ensure_workers(app):
+    # Bounded pool: PHOTO_UPLOAD_WORKERS greenthreads draining a queue of at most
+    # PHOTO_UPLOAD_QUEUE_SIZE pending uploads
+    global _queue
+    if _queue is None:
+        _queue = Queue(maxsize=app.config.get("PHOTO_UPLOAD_QUEUE_SIZE", 100))
+        for _ in range(app.config.get("PHOTO_UPLOAD_WORKERS", 4)):
+            eventlet.spawn(_worker, app)
+    return _queue
+
+
+def _worker(app):
+    while True:
+        job = _queue.get()
+        try:
+            with app.app_context():
+                process_upload(**job)
+        except Exception:
+            app.logger.exception("Photo upload worker failed for photo %s", job.get("photo_id"))
+
+
+def enqueue_upload(photo_id, spool_path, storage_path, content_type, org_id) -> bool:
+    """Queue a spooled photo for background upload. Returns False if the queue is full."""
+    app = current_app._get_current_object()
+    queue = _ensure_workers(app)
+    try:
+        queue.put_nowait({
+            "photo_id": photo_id,
+            "spool_path": spool_path,
+            "storage_path": storage_path,
+            "content_type": content_type,
+            "org_id": org_id,
+        })
+    except Full:
+        return False
+    return True
+
+
+def upload_photo_variants(storage, storage_path, fileobj, content_type):
+    """Upload a capped-resolution main image plus thumbnails next to it.
+
+    Returns (photo_url, {size: thumbnail_url}). Files that can't be processed as
+    images are uploaded unchanged without thumbnails.
+    """
+    config = current_app.config
+    # Decoding and resizing are CPU-bound; run them on a native thread, not the hub
+    variants = tpool.execute(
+        downscale,
+        fileobj,
+        config.get("PHOTO_MAX_DIMENSION", 2048),
+        config.get("PHOTO_THUMBNAIL_SIZES", (320,)),
+        config.get("PHOTO_JPEG_QUALITY", 85),
+    )
+    if variants is None:
+        fileobj.seek(0)
+        return storage.upload(storage_path, fileobj, content_type=content_type), {}
+
+    main, thumbnails, fmt = variants
+    ext, variant_type = FORMATS[fmt]
+    directory, _, filename = storage_path.rpartition("/")
+    base = f"{directory}/{filename.rsplit('.', 1)[0]}"
+    photo_url = storage.upload(f"{base}.{ext}", main, content_type=variant_type)
+    thumbnail_urls = {
+        str(size): storage.upload(f"{base}_thumb_{size}.{ext}", buf, content_type=variant_type)
+        for size, buf in thumbnails.items()
+    }
+    return photo_url, thumbnail_urls
+
+
+def process_upload(photo_id, spool_path, storage_path, content_type, org_id):
+    """Push a spooled file to storage with retry, then mark the photo ready or failed."""
+    retries = current_app.config.get("PHOTO_UPLOAD_RETRIES", 3)
+    backoff = current_app.config.get("PHOTO_UPLOAD_RETRY_BACKOFF", 1.0)
+    storage = get_storage()
+
+    photo_url, thumbnails = None, {}
+    try:
+        for attempt in range(retries + 1):
+            try:
+                with open(spool_path, "rb") as f:
+                    photo_url, thumbnails = upload_photo_variants(storage, storage_path, f, content_type)
+                break
+            except Exception as e:
+                current_app.logger.warning(
+                    "Upload of photo %s failed (attempt %s/%s): %s", photo_id, attempt + 1, retries + 1, e
+                )
+                if attempt < retries:
+                    eventlet.sleep(backoff * (2 ** attempt))
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+    photo = db.session.get(InspectionPhoto, photo_id)
+    if not photo:
+        return
+    if photo_url:
+        photo.url = photo_url
+        photo.thumbnails = thumbnails
+        photo.status = "ready"
+    else:
+        photo.status = "failed"
+    db.session.commit()
+
+    # Drivers without an org have no room to notify
+    if org_id:
+        notify_photo_processed(org_id, photo.to_dict())
@@ -0,0 +1,21 @@
+from operator import attrgetter
+
+
+def compile_serializer(fields, **computed):
+    """Build a function that turns a model instance into a dict.
+
+    The plain columns in `fields` are read with a single attrgetter call and
+    datetimes are left as datetime objects for the JSON provider to encode.
+    Keyword arguments map extra keys to functions of the instance.
+    """
+    keys = tuple(fields)
+    getter = attrgetter(*keys)
+    extra = tuple(computed.items())
+
+    def serialize(obj):
+        data = dict(zip(keys, getter(obj)))
+        for key, fn in extra:
+            data[key] = fn(obj)
+        return data
+
+    return serialize
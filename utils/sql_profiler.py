@@ -0,0 +1,140 @@
+import json
+import os
+import re
+import time
+import uuid
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import RelationshipProperty, Session
+
+# Bound parameter placeholders and literals collapse to "?" so the same
+# statement with different ids/values shares one fingerprint
+_PARAM = re.compile(r"%\(\w+\)s|__\[POSTCOMPILE_\w+\]|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_listening = False
+
+
+def fingerprint(statement):
+    normalized = _PARAM.sub("?", statement)
+    normalized = _IN_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def _profile():
+    if not has_request_context():
+        return None
+    return g.get("sql_profile")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profile() is not None:
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile()
+    if profile is None or not conn.info.get("profile_start"):
+        return
+    elapsed = time.perf_counter() - conn.info["profile_start"].pop()
+    entry = profile["statements"].setdefault(fingerprint(statement), {"count": 0, "seconds": 0.0})
+    entry["count"] += 1
+    entry["seconds"] += elapsed
+    profile["total_seconds"] += elapsed
+
+
+def _relationship_name(path):
+    for element in reversed(path.path):
+        if isinstance(element, RelationshipProperty):
+            return f"{element.parent.class_.__name__}.{element.key}"
+    return str(path)
+
+
+def _do_orm_execute(orm_execute_state):
+    # Each lazy load of a relationship is its own SELECT; many of them for the
+    # same attribute in one request is the N+1 pattern
+    profile = _profile()
+    if profile is None or not orm_execute_state.is_relationship_load:
+        return
+    name = _relationship_name(orm_execute_state.loader_strategy_path)
+    profile["relationship_loads"][name] = profile["relationship_loads"].get(name, 0) + 1
+
+
+def _listen():
+    global _listening
+    if _listening:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Session, "do_orm_execute", _do_orm_execute)
+    _listening = True
+
+
+def _summary(profile, threshold):
+    statements = profile["statements"]
+    return {
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "query_count": sum(s["count"] for s in statements.values()),
+        "total_ms": round(profile["total_seconds"] * 1000, 2),
+        "repeated": [
+            {"fingerprint": fp, "count": s["count"], "total_ms": round(s["seconds"] * 1000, 2)}
+            for fp, s in sorted(statements.items(), key=lambda item: -item[1]["count"])
+            if s["count"] >= threshold
+        ],
+        "n_plus_one": [
+            {"attribute": name, "loads": count}
+            for name, count in sorted(profile["relationship_loads"].items(), key=lambda item: -item[1])
+            if count >= threshold
+        ],
+    }
+
+
+def init_app(app):
+    """Enable with SQL_PROFILER=1; off by default since it adds per-statement overhead."""
+    if not app.config.get("SQL_PROFILER"):
+        return
+    _listen()
+
+    @app.before_request
+    def _start_profile():
+        g.sql_profile = {"statements": {}, "relationship_loads": {}, "total_seconds": 0.0}
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.pop("sql_profile", None)
+        if profile is None:
+            return response
+        summary = _summary(profile, app.config.get("SQL_PROFILER_REPEAT_THRESHOLD", 3))
+
+        for item in summary["n_plus_one"]:
+            current_app.logger.warning(
+                "N+1: %s lazily loaded %d times in %s %s",
+                item["attribute"], item["loads"], request.method, request.path,
+            )
+        for item in summary["repeated"]:
+            current_app.logger.info(
+                "Repeated statement x%d (%.1f ms) in %s %s: %s",
+                item["count"], item["total_ms"], request.method, request.path, item["fingerprint"],
+            )
+
+        if app.config.get("SQL_PROFILER_SERVER_TIMING"):
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={summary["total_ms"]};desc="{summary["query_count"]} queries"',
+            )
+
+        dump_dir = app.config.get("SQL_PROFILER_DUMP_DIR")
+        if dump_dir:
+            summary["statements"] = [
+                {"fingerprint": fp, "count": s["count"], "total_ms": round(s["seconds"] * 1000, 2)}
+                for fp, s in profile["statements"].items()
+            ]
+            os.makedirs(dump_dir, exist_ok=True)
+            name = f"{int(time.time() * 1000)}-{request.endpoint or 'unmatched'}-{uuid.uuid4().hex[:8]}.json"
+            with open(os.path.join(dump_dir, name), "w") as f:
+                json.dump(summary, f, indent=2)
+        return response
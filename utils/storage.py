@@ -0,0 +1,77 @@
+import json
+import os
+import shutil
+import threading
+from flask import current_app
+from utils.instrumentation import STORAGE_UPLOAD_SECONDS
+
+
+_firebase_lock = threading.Lock()
+
+
+def _init_firebase(service_account_key, bucket):
+    # Deferred until the first upload: firebase_admin pulls in google-cloud and grpc
+    import firebase_admin
+    from firebase_admin import credentials
+
+    with _firebase_lock:
+        if firebase_admin._apps:  # Prevent multiple initializations
+            return
+        if not service_account_key:
+            raise ValueError("FIREBASE_SERVICE_ACCOUNT_KEY environment variable not set")
+
+        # Try to parse as JSON (Render) or treat as path (local)
+        try:
+            cred = credentials.Certificate(json.loads(service_account_key))
+        except json.JSONDecodeError:
+            cred = credentials.Certificate(service_account_key)
+
+        firebase_admin.initialize_app(cred, {"storageBucket": bucket})
+
+
+class FirebaseStorage:
+    """Uploads to the default Firebase Storage bucket, initializing Firebase on first use."""
+
+    def __init__(self, service_account_key=None, bucket=None):
+        self.service_account_key = service_account_key
+        self.bucket = bucket
+
+    def upload(self, path, fileobj, content_type=None) -> str:
+        _init_firebase(self.service_account_key, self.bucket)
+        from firebase_admin import storage
+
+        blob = storage.bucket().blob(path)
+        with STORAGE_UPLOAD_SECONDS.labels("firebase").time():
+            blob.upload_from_file(fileobj, content_type=content_type)
+        return blob.public_url
+
+
+class LocalStorage:
+    """Writes files under a local directory; used for development and tests."""
+
+    def __init__(self, root, base_url=None):
+        self.root = root
+        self.base_url = (base_url or f"file://{os.path.abspath(root)}").rstrip("/")
+
+    def upload(self, path, fileobj, content_type=None) -> str:
+        dest = os.path.join(self.root, *path.split("/"))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with STORAGE_UPLOAD_SECONDS.labels("local").time(), open(dest, "wb") as out:
+            shutil.copyfileobj(fileobj, out)
+        return f"{self.base_url}/{path}"
+
+
+def get_storage():
+    # STORAGE_BACKEND: "firebase" (default) or "local"
+    backend = current_app.config.get("STORAGE_BACKEND", "firebase")
+    if backend == "local":
+        return LocalStorage(
+            current_app.config.get("LOCAL_STORAGE_ROOT", "uploads"),
+            current_app.config.get("LOCAL_STORAGE_URL"),
+        )
+    if backend == "firebase":
+        return FirebaseStorage(
+            current_app.config.get("FIREBASE_SERVICE_ACCOUNT_KEY"),
+            current_app.config.get("FIREBASE_STORAGE_BUCKET"),
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}'")
@@ -0,0 +1,125 @@
+import json
+import threading
+from cachetools import LRUCache
+from flask import current_app
+from extensions import db
+from models.template_item import TemplateItem
+
+# Entries are keyed by (template_id, version), so a template's version must change
+# whenever its cached data does; stale entries are then never read again, even on
+# a shared backend. edit_template bumps it explicitly and models.template bumps it
+# for any other ORM update of a serialized column (org reassignment included).
+# Bulk SQL that bypasses the ORM can't, so it must call invalidate() after it
+# commits, as delete_template and org deletion do. Ids aren't reused, so an entry
+# re-cached for a deleted template is never read either.
+
+
+class LocalCacheBackend:
+    def __init__(self, maxsize=1024):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._cache.pop(key, None)
+
+
+class RedisCacheBackend:
+    """Shared backend so every worker reuses the same serialized templates."""
+
+    def __init__(self, url, ttl=3600):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._ttl = ttl
+
+    def get(self, key):
+        value = self._client.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value):
+        self._client.set(key, json.dumps(value), ex=self._ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*keys)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                url = current_app.config.get("TEMPLATE_CACHE_URL")
+                if url:
+                    _backend = RedisCacheBackend(url, current_app.config.get("TEMPLATE_CACHE_TTL", 3600))
+                else:
+                    _backend = LocalCacheBackend(current_app.config.get("TEMPLATE_CACHE_SIZE", 1024))
+    return _backend
+
+
+def _template_key(template_id, version):
+    return f"template:{template_id}:{version or 0}"
+
+
+def _items_key(template_id, version):
+    return f"template_items:{template_id}:{version or 0}"
+
+
+def template_dict(template):
+    """Cached Template.to_dict()."""
+    backend = _get_backend()
+    key = _template_key(template.id, template.version)
+    data = backend.get(key)
+    if data is None:
+        data = template.to_dict()
+        backend.set(key, data)
+    return data
+
+
+def item_names_many(templates):
+    """Return {template_id: {item_id: name}} for (template_id, version) pairs.
+
+    Cache misses are filled with a single template_items query.
+    """
+    backend = _get_backend()
+    names, missing = {}, {}
+    for template_id, version in templates:
+        cached = backend.get(_items_key(template_id, version))
+        if cached is None:
+            missing[template_id] = version
+        else:
+            names[template_id] = {int(item_id): name for item_id, name in cached}
+
+    if missing:
+        rows = (db.session.query(TemplateItem.template_id, TemplateItem.id, TemplateItem.name)
+                .filter(TemplateItem.template_id.in_(missing.keys()))
+                .all())
+        loaded = {template_id: {} for template_id in missing}
+        for template_id, item_id, name in rows:
+            loaded[template_id][item_id] = name
+        for template_id, items in loaded.items():
+            backend.set(_items_key(template_id, missing[template_id]), list(items.items()))
+        names.update(loaded)
+    return names
+
+
+def item_names(template_id, version):
+    return item_names_many([(template_id, version)])[template_id]
+
+
+def invalidate(template_id, version):
+    _get_backend().delete(_template_key(template_id, version), _items_key(template_id, version))
@@ -0,0 +1,68 @@
+import threading
+from cachetools import TTLCache
+from flask import current_app, jsonify
+from sqlalchemy.orm import load_only, lazyload, make_transient_to_detached
+from extensions import db, jwt
+from models.user import User
+
+# Columns routes need for authorization and driver snapshots. Everything else
+# (password_hash, phone_number, timestamps, the org relationship) loads lazily on access.
+AUTH_COLUMNS = ("id", "email", "role", "org_id", "first_name", "last_name")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _get_cache():
+    # Process-local cache, disabled unless USER_CACHE_TTL > 0
+    global _cache
+    ttl = current_app.config.get("USER_CACHE_TTL", 0)
+    if not ttl:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTLCache(maxsize=current_app.config.get("USER_CACHE_SIZE", 1024), ttl=ttl)
+    return _cache
+
+
+def _from_cached(values):
+    # Re-attach a cached snapshot to the request session without a SELECT
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+@jwt.user_lookup_loader
+def load_current_user(_jwt_header, jwt_data):
+    """Loaded once per request by flask_jwt_extended; read it with get_current_user()."""
+    user_id = int(jwt_data["sub"])
+    cache = _get_cache()
+    if cache is not None:
+        with _cache_lock:
+            values = cache.get(user_id)
+        if values is not None:
+            return _from_cached(values)
+
+    user = (User.query
+            .options(load_only(*[getattr(User, c) for c in AUTH_COLUMNS]), lazyload(User.org))
+            .filter_by(id=user_id)
+            .first())
+    if user is not None and cache is not None:
+        with _cache_lock:
+            cache[user_id] = {c: getattr(user, c) for c in AUTH_COLUMNS}
+    return user
+
+
+@jwt.user_lookup_error_loader
+def user_lookup_error(_jwt_header, _jwt_data):
+    return jsonify({"error": "User not found"}), 404
+
+
+def invalidate_user(*user_ids):
+    """Drop cached users after their role or org membership changes."""
+    if _cache is None:
+        return
+    with _cache_lock:
+        for user_id in user_ids:
+            _cache.pop(int(user_id), None)